@@ -0,0 +1,318 @@
+from ft_response import GetBestMatchInput, GetBestMatchResponse, BestMatchTaxInfo
+from ft_cache import ResultCache
+from ft_retry import RetryPolicy
+from ft_zip_index import ZipRateIndex
+from collections import deque
+from dataclasses import asdict, fields
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+# Input columns/keys, matched case-insensitively
+INPUT_FIELDS = ("Address", "Address2", "City", "State", "Zip", "TaxType")
+
+# CSV output: one row per BestMatchTaxInfo (or one row carrying the error), InformationComponents as JSON
+TAX_INFO_FIELDS = tuple(field.name for field in fields(BestMatchTaxInfo))
+CSV_FIELDS = ("Row", "Id", "MatchLevel") + TAX_INFO_FIELDS + ("ErrorNumber", "ErrorDesc", "ErrorLocation")
+
+
+def _format(path: str, format: Optional[str]) -> str:
+    if format:
+        return format
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def read_records(path: str, format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily yield one dict per CSV row (header required) or JSONL line of the input file."""
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        if _format(path, format) == "jsonl":
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(source)
+
+
+def _to_input(
+    record: Dict[str, Any],
+    tax_type: str,
+    license_key: str,
+    is_live: bool,
+    timeout_seconds: Optional[float],
+) -> GetBestMatchInput:
+    # JSONL values may be numbers (e.g., "Zip": 93101); the service and normalization expect text
+    values = {name.lower(): str(value) for name, value in record.items() if name and value is not None}
+    return GetBestMatchInput(
+        Address=values.get("address"),
+        Address2=values.get("address2"),
+        City=values.get("city"),
+        State=values.get("state"),
+        Zip=values.get("zip"),
+        TaxType=values.get("taxtype") or tax_type,
+        LicenseKey=license_key,
+        IsLive=is_live,
+        TimeoutSeconds=timeout_seconds,
+    )
+
+
+def _error_fields(result: Union[GetBestMatchResponse, Exception]) -> Tuple[Any, Any, Any]:
+    if isinstance(result, Exception):
+        return None, f"{type(result).__name__}: {result}", None
+    if result.Error:
+        return result.Error.Number, result.Error.Desc, result.Error.Location
+    return None, None, None
+
+
+def _csv_rows(row: int, id: Any, result: Union[GetBestMatchResponse, Exception]) -> Iterator[List[Any]]:
+    error = list(_error_fields(result))
+    items = result.TaxInfoItems if isinstance(result, GetBestMatchResponse) else None
+    match_level = result.MatchLevel if isinstance(result, GetBestMatchResponse) else None
+    if not items:
+        yield [row, id, match_level] + [None] * len(TAX_INFO_FIELDS) + error
+        return
+    for item in items:
+        values = []
+        for name in TAX_INFO_FIELDS:
+            value = getattr(item, name)
+            if name == "InformationComponents":
+                value = json.dumps([asdict(component) for component in value or ()], separators=(",", ":"))
+            values.append(value)
+        yield [row, id, match_level] + values + error
+
+
+def _jsonl_line(row: int, id: Any, result: Union[GetBestMatchResponse, Exception]) -> str:
+    if isinstance(result, Exception):
+        number, desc, location = _error_fields(result)
+        record = {"TaxInfoItems": [], "MatchLevel": None, "Error": {"Desc": desc, "Number": number, "Location": location}}
+    else:
+        record = asdict(result)
+        del record["Debug"]
+    return json.dumps({"Row": row, "Id": id, **record}, separators=(",", ":")) + "\n"
+
+
+class BulkStats:
+    def __init__(self):
+        """
+        Counters of one run_bulk() call.
+
+        rows: Input rows processed in this run (excluding rows skipped on resume).
+        errors: Rows that ended with an exception or an Error payload.
+        skipped: Rows already done by an earlier run and skipped on resume.
+        """
+        self.rows = 0
+        self.errors = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        rate = self.rows / self.elapsed if self.elapsed else 0.0
+        return (f"BulkStats: Rows={self.rows}, Errors={self.errors}, Skipped={self.skipped}, "
+                f"Elapsed={self.elapsed:.1f}s, RowsPerSecond={rate:.1f}")
+
+
+def _read_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as checkpoint_file:
+            return json.load(checkpoint_file)
+    except FileNotFoundError:
+        return None
+
+
+def _write_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    # Write-then-rename so a crash never leaves a half-written checkpoint behind
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+        json.dump(state, checkpoint_file)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temp_path, path)
+
+
+def run_bulk(
+    client,
+    input_path: str,
+    output_path: str,
+    license_key: str,
+    is_live: bool = True,
+    tax_type: str = "sales",
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    id_field: Optional[str] = None,
+    concurrency: int = 8,
+    timeout_seconds: Optional[float] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 1000,
+    resume: bool = False,
+    dedupe: bool = False,
+) -> BulkStats:
+    """
+    Stream every row of input_path through client (a FastTaxClient) and write the results to output_path
+    as they complete, in input order. Memory stays flat regardless of file size: rows are read lazily
+    and at most 2 * concurrency lookups are queued (see FastTaxClient.iter_best_match_batch()).
+
+    Every checkpoint_every rows the output is flushed to disk and the number of rows done, together with
+    the output size, is written to checkpoint_path. With resume=True a run continues after the last
+    checkpoint: output written after it is truncated and the rows it covered are skipped. The checkpoint
+    records the input file, and resuming against a different one is refused.
+
+    Parameters:
+        client: FastTaxClient (or ft_sharded.ShardedExecutor) used for the lookups.
+        input_path: CSV (with a header row) or JSONL file with Address/Address2/City/State/Zip/TaxType.
+        output_path: CSV file (one row per BestMatchTaxInfo) or JSONL file (one line per input row).
+        license_key, is_live: Passed to every lookup.
+        tax_type: Used for rows without a TaxType.
+        input_format, output_format: "csv" or "jsonl"; guessed from the file extension when None.
+        id_field: Input column copied into the Id column of the output, to join results back.
+        concurrency: Number of lookups in flight at once.
+        timeout_seconds: Overall deadline of each lookup.
+        checkpoint_path: Checkpoint file (defaults to output_path + ".checkpoint").
+        checkpoint_every: Rows between checkpoints.
+        resume: Continue from the checkpoint instead of starting over.
+        dedupe: Send normalized inputs and share lookups between equivalent rows queued together
+                (see FastTaxClient.iter_best_match_batch()); pair it with a cache for file-wide dedup.
+
+    Returns:
+        BulkStats: Counters of this run.
+
+    Raises:
+        ValueError: If resume is set and the checkpoint was written for another input file.
+    """
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+    output_format = _format(output_path, output_format)
+    stats = BulkStats()
+    start = time.monotonic()
+
+    state = _read_checkpoint(checkpoint_path) if resume else None
+    if state is not None and state.get("input") != os.path.abspath(input_path):
+        raise ValueError(
+            f"Checkpoint {checkpoint_path} belongs to input {state.get('input')}, not {os.path.abspath(input_path)}; "
+            "resume with the same input or start over without --resume"
+        )
+    if state is not None and state.get("done"):
+        stats.skipped = state["rows"]
+        return stats
+    done_rows = state["rows"] if state is not None else 0
+    offset = state["offset"] if state is not None else 0
+    stats.skipped = done_rows
+
+    if offset:
+        with open(output_path, "r+b") as output_file:
+            output_file.truncate(offset)
+    output = open(output_path, "a" if offset else "w", newline="", encoding="utf-8")
+    writer = csv.writer(output) if output_format == "csv" else None
+    if writer is not None and not offset:
+        writer.writerow(CSV_FIELDS)
+
+    ids: Deque[Any] = deque()
+    id_key = id_field.lower() if id_field else None
+
+    def inputs() -> Iterator[GetBestMatchInput]:
+        for position, record in enumerate(read_records(input_path, input_format)):
+            if position < done_rows:
+                continue
+            if id_key is not None:
+                ids.append(next((value for name, value in record.items() if name and name.lower() == id_key), None))
+            else:
+                ids.append(None)
+            yield _to_input(record, tax_type, license_key, is_live, timeout_seconds)
+
+    def checkpoint(done: bool = False) -> None:
+        output.flush()
+        os.fsync(output.fileno())
+        _write_checkpoint(checkpoint_path, {
+            "input": os.path.abspath(input_path),
+            "rows": done_rows + stats.rows,
+            "offset": output.buffer.tell(),
+            "done": done,
+        })
+
+    try:
+        for result in client.iter_best_match_batch(inputs(), concurrency, dedupe):
+            row = done_rows + stats.rows
+            id = ids.popleft()
+            if isinstance(result, Exception) or result.Error:
+                stats.errors += 1
+            if writer is not None:
+                writer.writerows(_csv_rows(row, id, result))
+            else:
+                output.write(_jsonl_line(row, id, result))
+            stats.rows += 1
+            if stats.rows % checkpoint_every == 0:
+                checkpoint()
+        checkpoint(done=True)
+    finally:
+        output.close()
+    stats.elapsed = time.monotonic() - start
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rate a CSV or JSONL file of addresses with FastTax GetBestMatch.")
+    parser.add_argument("input", help="CSV (with header) or JSONL file with Address, Address2, City, State, Zip, TaxType.")
+    parser.add_argument("output", help="CSV or JSONL file for the results.")
+    parser.add_argument("--license-key", required=True)
+    parser.add_argument("--trial", action="store_true", help="Use the trial endpoint.")
+    parser.add_argument("--tax-type", default="sales", help="TaxType for rows that do not have one.")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="Defaults to the input file extension.")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="Defaults to the output file extension.")
+    parser.add_argument("--id-field", help="Input column copied to the Id column of the output.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=15, help="Overall deadline of each lookup, in seconds.")
+    parser.add_argument("--retries", type=int, default=2, help="Retries when no endpoint answers.")
+    parser.add_argument("--cache-size", type=int, default=0, help="Cache this many distinct addresses (0 disables).")
+    parser.add_argument("--zip-index", help="ZipRateIndex file to answer ZIP-only rows from.")
+    parser.add_argument("--checkpoint", help="Checkpoint file (defaults to OUTPUT.checkpoint).")
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="Continue after the last checkpoint.")
+    parser.add_argument("--dedupe", action="store_true", help="Normalize rows and look up equivalent rows once.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Rate on this many worker processes, each with --concurrency threads (0: in-process).")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second, shared by all workers.")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adapt the requests in flight (up to --concurrency) to the service's latency and errors.")
+    args = parser.parse_args(argv)
+
+    zip_index = None
+    if args.workers:
+        from ft_sharded import ShardedExecutor
+
+        client = ShardedExecutor(
+            args.workers,
+            {"retry": RetryPolicy(max_attempts=args.retries + 1)},
+            concurrency=args.concurrency,
+            cache_size=args.cache_size,
+            zip_index_path=args.zip_index,
+            rate_limit_qps=args.rate_limit,
+            adaptive=args.adaptive,
+        )
+    else:
+        from get_best_match_rest import FastTaxClient
+        from ft_rate_limit import AdaptiveConcurrency, RateLimiter
+
+        zip_index = ZipRateIndex(args.zip_index) if args.zip_index else None
+        client = FastTaxClient(
+            pool_maxsize=max(args.concurrency, 10),
+            cache=ResultCache(max_size=args.cache_size) if args.cache_size else None,
+            zip_index=zip_index,
+            retry=RetryPolicy(max_attempts=args.retries + 1),
+            rate_limiter=RateLimiter(args.rate_limit) if args.rate_limit else None,
+            concurrency_limiter=AdaptiveConcurrency(args.concurrency, max_limit=args.concurrency)
+            if args.adaptive else None,
+        )
+    with client:
+        stats = run_bulk(
+            client, args.input, args.output, args.license_key, not args.trial, args.tax_type,
+            args.input_format, args.output_format, args.id_field, args.concurrency, args.timeout,
+            args.checkpoint, args.checkpoint_every, args.resume, args.dedupe,
+        )
+    if zip_index is not None:
+        zip_index.close()
+    print(stats, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
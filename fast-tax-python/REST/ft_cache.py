@@ -0,0 +1,81 @@
+from ft_normalize import make_key
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import threading
+import time
+
+
+class ResultCache:
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Thread-safe, size-bounded LRU cache with a TTL for parsed GetBestMatch results.
+
+        Keys are built from the canonical Address/Address2/City/State/Zip/TaxType plus IsLive (see
+        make_key()), so trial and live results never share an entry.
+        Only parsed responses are stored, never raw payloads, and responses carrying an Error are
+        never cached. Cached responses are shared between callers and must be treated as read-only.
+
+        max_size: Maximum number of entries; the least recently used entry is evicted first.
+        ttl_seconds: Seconds an entry stays valid after it was stored.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        address: Optional[str],
+        address2: Optional[str],
+        city: Optional[str],
+        state: Optional[str],
+        zip: Optional[str],
+        tax_type: Optional[str],
+        is_live: bool = True,
+    ) -> Tuple:
+        """
+        Build a cache key shared by inputs that only differ in formatting (see ft_normalize.make_key()).
+        is_live keeps trial and live results apart.
+        """
+        return make_key(address, address2, city, state, zip, tax_type) + (is_live,)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return the cached response for key, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple, response: Any) -> None:
+        """Store a parsed response under key. Responses with an Error are ignored."""
+        if response is None or getattr(response, "Error", None):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return (f"ResultCache: Size={len(self)}, MaxSize={self.max_size}, TtlSeconds={self.ttl_seconds}, "
+                f"Hits={self.hits}, Misses={self.misses}, Evictions={self.evictions}")
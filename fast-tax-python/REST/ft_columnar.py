@@ -0,0 +1,247 @@
+from ft_response import GetBestMatchResponse
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Union
+import math
+import os
+
+# Columns of the items table: one row per BestMatchTaxInfo
+ITEM_STRING_FIELDS = ("Zip", "City", "County", "StateAbbreviation", "StateName", "TotalTaxExempt", "NotesCodes",
+                      "NotesDesc")
+ITEM_RATE_FIELDS = ("TaxRate", "StateRate", "CityRate", "CountyRate", "CountyDistrictRate", "CityDistrictRate",
+                    "SpecialDistrictRate")
+
+
+class _StringColumn:
+    """Dictionary-encoded strings: an int32 code per row plus each distinct value (None included) once."""
+    __slots__ = ("codes", "values", "_lookup")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values: List[Optional[str]] = []
+        self._lookup: Dict[Optional[str], int] = {}
+
+    def append(self, value: Optional[str]) -> None:
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def to_numpy(self):
+        import numpy as np
+
+        values = np.empty(len(self.values), dtype=object)
+        values[:] = self.values
+        return values[np.frombuffer(self.codes, dtype=np.int32)]
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        indices = pa.Array.from_buffers(pa.int32(), len(self.codes), [None, pa.py_buffer(self.codes)])
+        null_code = self._lookup.get(None)
+        if null_code is None:
+            return pa.DictionaryArray.from_arrays(indices, pa.array(self.values, pa.string()))
+        # Parquet cannot write a null inside the dictionary, so None becomes a null index instead
+        remap = list(range(len(self.values)))
+        remap[null_code] = None
+        for code in range(null_code + 1, len(remap)):
+            remap[code] -= 1
+        dictionary = self.values[:null_code] + self.values[null_code + 1:]
+        indices = pa.array(remap, pa.int32()).take(indices)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(dictionary, pa.string()))
+
+
+def _int_column_to_arrow(values: array):
+    import pyarrow as pa
+
+    return pa.Array.from_buffers(pa.int64(), len(values), [None, pa.py_buffer(values)])
+
+
+def _float_column_to_arrow(values: array):
+    import pyarrow as pa
+
+    return pa.Array.from_buffers(pa.float64(), len(values), [None, pa.py_buffer(values)])
+
+
+def _rate(value: Any) -> float:
+    return float(value) if value not in (None, "") else math.nan
+
+
+class ColumnarResults:
+    def __init__(self):
+        """
+        Column-oriented container for GetBestMatch batch results, filled one result at a time without
+        keeping a Python object per row. Numbers live in typed arrays and strings are dictionary-encoded,
+        so NumPy and Arrow exports reuse the same memory instead of copying it. Because of that, the first
+        export freezes the container: appending afterwards would have to move buffers that exported arrays
+        still point at, so it raises RuntimeError. Append everything first (a container can be filled by
+        several get_best_match_columnar() calls), then export.
+
+        Three tables are kept:
+            items: One row per BestMatchTaxInfo. Row is the input position, Candidate the position within
+                   its response (ZIP-level matches have several), MatchLevel, the string fields and the
+                   rates (NaN when absent).
+            components: InformationComponents flattened as (Item, Name, Value); Item is the items row.
+            errors: One row per input that produced no items: Row, ErrorNumber, ErrorDesc, ErrorLocation
+                    and Exception (the class name when the lookup raised).
+        """
+        self.rows = 0
+        self.frozen = False
+        self._item_row = array("q")
+        self._item_candidate = array("q")
+        self._item_match_level = _StringColumn()
+        self._item_strings = {name: _StringColumn() for name in ITEM_STRING_FIELDS}
+        self._item_rates = {name: array("d") for name in ITEM_RATE_FIELDS}
+        self._component_item = array("q")
+        self._component_name = _StringColumn()
+        self._component_value = _StringColumn()
+        self._error_row = array("q")
+        self._error_number = _StringColumn()
+        self._error_desc = _StringColumn()
+        self._error_location = _StringColumn()
+        self._error_exception = _StringColumn()
+
+    @classmethod
+    def from_results(cls, results: Iterable[Union[GetBestMatchResponse, dict, Exception, None]]) -> "ColumnarResults":
+        """Build a container from results in input order (e.g., FastTaxClient.iter_best_match_batch())."""
+        columns = cls()
+        columns.extend(results)
+        return columns
+
+    def extend(self, results: Iterable[Union[GetBestMatchResponse, dict, Exception, None]]) -> None:
+        self._check_writable()
+        for result in results:
+            self.append(result)
+
+    def append(self, result: Union[GetBestMatchResponse, dict, Exception, None]) -> None:
+        """
+        Add the result of the next input row. Accepts GetBestMatchResponse objects, raw payload dicts
+        (FastTaxClient(raw=True), which skips building dataclasses entirely), exceptions and None.
+
+        Raises:
+            RuntimeError: If the container was already exported.
+        """
+        self._check_writable()
+        row = self.rows
+        self.rows += 1
+        if isinstance(result, dict):
+            items, match_level, error = result.get("TaxInfoItems"), result.get("MatchLevel"), result.get("Error")
+        elif isinstance(result, GetBestMatchResponse):
+            items, match_level, error = result.TaxInfoItems, result.MatchLevel, result.Error
+        else:
+            items = match_level = error = None
+
+        if not items or error:
+            self._error_row.append(row)
+            if isinstance(error, dict):
+                error_fields = (error.get("Number"), error.get("Desc"), error.get("Location"))
+            elif error:
+                error_fields = (error.Number, error.Desc, error.Location)
+            else:
+                error_fields = (None, None, None)
+            self._error_number.append(error_fields[0])
+            self._error_desc.append(error_fields[1] if not isinstance(result, Exception) else str(result))
+            self._error_location.append(error_fields[2])
+            self._error_exception.append(type(result).__name__ if isinstance(result, Exception) else None)
+            return
+
+        for candidate, item in enumerate(items):
+            get = item.get if isinstance(item, dict) else item.__getattribute__
+            item_id = len(self._item_row)
+            self._item_row.append(row)
+            self._item_candidate.append(candidate)
+            self._item_match_level.append(match_level)
+            for name, column in self._item_strings.items():
+                column.append(get(name))
+            for name, column in self._item_rates.items():
+                column.append(_rate(get(name)))
+            for component in get("InformationComponents") or ():
+                if isinstance(component, dict):
+                    name, value = component.get("Name"), component.get("Value")
+                else:
+                    name, value = component.Name, component.Value
+                self._component_item.append(item_id)
+                self._component_name.append(name)
+                self._component_value.append(value)
+
+    def _check_writable(self) -> None:
+        if self.frozen:
+            raise RuntimeError("ColumnarResults was exported and is frozen; append to a new container instead")
+
+    def __len__(self) -> int:
+        """Number of items rows."""
+        return len(self._item_row)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Return the items table as NumPy arrays by column name. Row, Candidate and the rates are views
+        of the container's memory; strings are decoded into object arrays. Freezes the container.
+        """
+        import numpy as np
+
+        self.frozen = True
+        columns = {
+            "Row": np.frombuffer(self._item_row, dtype=np.int64),
+            "Candidate": np.frombuffer(self._item_candidate, dtype=np.int64),
+            "MatchLevel": self._item_match_level.to_numpy(),
+        }
+        columns.update((name, column.to_numpy()) for name, column in self._item_strings.items())
+        columns.update((name, np.frombuffer(column, dtype=np.float64)) for name, column in self._item_rates.items())
+        return columns
+
+    def items_table(self):
+        """
+        Return the items table as a pyarrow.Table (numeric columns zero-copy, strings dictionary-encoded).
+        Freezes the container.
+        """
+        import pyarrow as pa
+
+        self.frozen = True
+        columns = {
+            "Row": _int_column_to_arrow(self._item_row),
+            "Candidate": _int_column_to_arrow(self._item_candidate),
+            "MatchLevel": self._item_match_level.to_arrow(),
+        }
+        columns.update((name, column.to_arrow()) for name, column in self._item_strings.items())
+        columns.update((name, _float_column_to_arrow(column)) for name, column in self._item_rates.items())
+        return pa.table(columns)
+
+    def components_table(self):
+        """
+        Return the InformationComponents child table as a pyarrow.Table; Item joins to the items row.
+        Freezes the container.
+        """
+        import pyarrow as pa
+
+        self.frozen = True
+        return pa.table({
+            "Item": _int_column_to_arrow(self._component_item),
+            "Name": self._component_name.to_arrow(),
+            "Value": self._component_value.to_arrow(),
+        })
+
+    def errors_table(self):
+        """Return the errors table as a pyarrow.Table. Freezes the container."""
+        import pyarrow as pa
+
+        self.frozen = True
+        return pa.table({
+            "Row": _int_column_to_arrow(self._error_row),
+            "ErrorNumber": self._error_number.to_arrow(),
+            "ErrorDesc": self._error_desc.to_arrow(),
+            "ErrorLocation": self._error_location.to_arrow(),
+            "Exception": self._error_exception.to_arrow(),
+        })
+
+    def write_parquet(self, directory: str, **options) -> None:
+        """Write items.parquet, components.parquet and errors.parquet to directory (options go to write_table)."""
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        pq.write_table(self.items_table(), os.path.join(directory, "items.parquet"), **options)
+        pq.write_table(self.components_table(), os.path.join(directory, "components.parquet"), **options)
+        pq.write_table(self.errors_table(), os.path.join(directory, "errors.parquet"), **options)
+
+    def __str__(self) -> str:
+        return (f"ColumnarResults: Rows={self.rows}, Items={len(self)}, "
+                f"Components={len(self._component_item)}, Errors={len(self._error_row)}")
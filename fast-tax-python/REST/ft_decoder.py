@@ -0,0 +1,196 @@
+from ft_response import GetBestMatchResponse, BestMatchTaxInfo, InformationComponent, Error
+from dataclasses import fields
+from functools import partial
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+from xml.etree.ElementTree import XMLPullParser
+import json
+
+# Use orjson when it is installed; it parses FastTax payloads several times faster than json
+try:
+    import orjson
+
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+
+def _field_names(cls) -> tuple:
+    return tuple(field.name for field in fields(cls))
+
+
+# Field tables in constructor order, derived from the models so they never drift apart.
+# BestMatchTaxInfo is built positionally: the scalar fields before InformationComponents, the
+# decoded component list, then the scalar fields after it.
+_TAX_INFO_FIELDS = _field_names(BestMatchTaxInfo)
+_COMPONENTS_POSITION = _TAX_INFO_FIELDS.index("InformationComponents")
+_TAX_INFO_HEAD = _TAX_INFO_FIELDS[:_COMPONENTS_POSITION]
+_TAX_INFO_TAIL = _TAX_INFO_FIELDS[_COMPONENTS_POSITION + 1:]
+_ERROR_FIELDS = _field_names(Error)
+# XML carries every value as text; these are numbers in the JSON payloads and the models
+_RATE_FIELDS = frozenset(name for name in _TAX_INFO_FIELDS if name.endswith("Rate"))
+_XSI_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+# Elements holding a whole BestMatchResponse: the SOAP result and the REST XML document root
+_RESULT_ELEMENTS = frozenset(("GetBestMatchResult", "BestMatchResponse"))
+_XML_CHUNK_SIZE = 64 * 1024
+
+
+def loads(payload: Union[bytes, str]) -> Dict[str, Any]:
+    """Parse a JSON payload with the fastest available backend (see JSON_BACKEND)."""
+    return _loads(payload)
+
+
+def decode_tax_info(item: Dict[str, Any]) -> BestMatchTaxInfo:
+    """Decode one BestMatchTaxInfo JSON object."""
+    get = item.get
+    components = get("InformationComponents")
+    return BestMatchTaxInfo(
+        *map(get, _TAX_INFO_HEAD),
+        [InformationComponent(component.get("Name"), component.get("Value")) for component in components]
+        if components else [],
+        *map(get, _TAX_INFO_TAIL),
+    )
+
+
+def decode_best_match(data: Dict[str, Any]) -> GetBestMatchResponse:
+    """Decode a parsed GetBestMatch JSON payload into a GetBestMatchResponse."""
+    error = data.get("Error")
+    items = data.get("TaxInfoItems")
+    return GetBestMatchResponse(
+        [decode_tax_info(item) for item in items] if items else [],
+        data.get("MatchLevel"),
+        Error(*map(error.get, _ERROR_FIELDS)) if error else None,
+        data.get("Debug", []),
+    )
+
+
+def decode_best_match_bytes(payload: Union[bytes, str]) -> GetBestMatchResponse:
+    """Parse and decode a raw GetBestMatch JSON payload in one step."""
+    return decode_best_match(_loads(payload))
+
+
+class BestMatchXmlParser:
+    def __init__(self):
+        """
+        Incremental decoder of a GetBestMatch XML answer (a SOAP envelope or a REST XML document) into
+        the same dict shape as the JSON payload, with rates as floats. feed() chunks as they arrive from
+        the network and call close() for the payload; each element is discarded once its value has been
+        taken, so memory does not grow with the XML tree.
+        """
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._data: Dict[str, Any] = {}
+        self._found = False
+        self._items = self._item = self._components = self._component = self._error = None
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Parse the next chunk of the document.
+
+        Raises:
+            ValueError: If the document is a SOAP fault.
+            xml.etree.ElementTree.ParseError: If the document is not well-formed XML.
+        """
+        self._parser.feed(chunk)
+        self._consume()
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """Finish parsing; return the payload, or None when the document has no result (a nil result element)."""
+        self._parser.close()
+        self._consume()
+        return self._data if self._found else None
+
+    def _consume(self) -> None:
+        data = self._data
+        items, item, components, component, error = (
+            self._items, self._item, self._components, self._component, self._error
+        )
+        for event, element in self._parser.read_events():
+            name = element.tag.rpartition("}")[2]
+            if event == "start":
+                if name == "BestMatchTaxInfo":
+                    item = {}
+                elif name == "InformationComponent":
+                    component = {}
+                elif name == "InformationComponents":
+                    components = []
+                elif name == "TaxInfoItems":
+                    items = []
+                elif name == "Error":
+                    error = {}
+                continue
+
+            nil = element.get(_XSI_NIL) == "true"
+            text = None if nil else element.text or ""
+            if component is not None:
+                if name == "InformationComponent":
+                    components.append(component)
+                    component = None
+                else:
+                    component[name] = text
+            elif components is not None and name == "InformationComponents":
+                item[name] = components
+                components = None
+            elif item is not None:
+                if name == "BestMatchTaxInfo":
+                    items.append(item)
+                    item = None
+                elif name in _RATE_FIELDS:
+                    # An empty rate (<TaxRate/>) has no value, like an xsi:nil one
+                    item[name] = float(text) if text and not text.isspace() else None
+                else:
+                    item[name] = text
+            elif error is not None:
+                if name == "Error":
+                    data["Error"] = None if nil else error
+                    error = None
+                else:
+                    error[name] = text
+            elif name == "TaxInfoItems":
+                data["TaxInfoItems"] = items
+            elif name == "MatchLevel":
+                data[name] = text
+            elif name == "Debug":
+                data[name] = [text] if text else []
+            elif name in _RESULT_ELEMENTS:
+                self._found = not nil
+            elif name == "faultstring":
+                raise ValueError(f"SOAP fault: {text}")
+            element.clear()
+        self._items, self._item, self._components, self._component, self._error = (
+            items, item, components, component, error
+        )
+
+
+def parse_best_match_xml(payload: Union[bytes, str, BinaryIO]) -> Optional[Dict[str, Any]]:
+    """
+    Parse a GetBestMatch XML answer with BestMatchXmlParser. payload may also be a binary file-like
+    object (e.g., a streamed response's raw body), which is parsed as it is read.
+
+    Returns:
+        dict: The payload, or None when the document has no result.
+
+    Raises:
+        ValueError: If the document is a SOAP fault.
+        xml.etree.ElementTree.ParseError: If the document is not well-formed XML.
+    """
+    parser = BestMatchXmlParser()
+    if isinstance(payload, str):
+        parser.feed(payload.encode("utf-8"))
+    elif isinstance(payload, (bytes, bytearray, memoryview)):
+        parser.feed(payload)
+    else:
+        for chunk in iter(partial(payload.read, _XML_CHUNK_SIZE), b""):
+            parser.feed(chunk)
+    return parser.close()
+
+
+def decode_best_match_xml(payload: Union[bytes, str]) -> Optional[GetBestMatchResponse]:
+    """Parse and decode a GetBestMatch XML answer in one step; None when it holds no result."""
+    data = parse_best_match_xml(payload)
+    return decode_best_match(data) if data is not None else None
+
+
+def tax_rates(data: Dict[str, Any]) -> List[Any]:
+    """Return the TaxRate of every TaxInfoItems row of a raw (undecoded) payload, without building models."""
+    return [item.get("TaxRate") for item in data.get("TaxInfoItems") or ()]
@@ -0,0 +1,217 @@
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from ft_retry import DeadlineExceeded
+from typing import Any, Awaitable, Callable, Optional
+import threading
+import time
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        """
+        Classic three-state circuit breaker.
+
+        failure_threshold: Consecutive failures that trip the breaker open.
+        reset_timeout: Seconds the breaker stays open before letting probe calls through (half-open).
+        half_open_max_calls: Probe calls allowed at once while half-open; a successful probe closes
+                             the breaker and a failed one re-opens it for another reset_timeout.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True when a call may be sent to the endpoint now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+            elif time.monotonic() - self._opened_at >= self.reset_timeout:
+                # A probe never reported back (e.g., it was cancelled): allow a fresh one
+                self._opened_at = time.monotonic()
+                self._probes = 0
+            if self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class EndpointHealth:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        ewma_alpha: float = 0.2,
+    ):
+        """
+        Health state of one endpoint: a CircuitBreaker plus an exponentially weighted moving average
+        of call latency and running call/failure counts.
+
+        name: Label used in reports (e.g., "primary" or "backup").
+        failure_threshold, reset_timeout: Passed to the CircuitBreaker.
+        ewma_alpha: Weight of the newest latency sample in latency_ewma (0 < alpha <= 1).
+        """
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.ewma_alpha = ewma_alpha
+        self.latency_ewma: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self.breaker.state
+
+    def allow_request(self) -> bool:
+        return self.breaker.allow_request()
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one finished call: its latency in seconds and whether it succeeded."""
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.ewma_alpha * (latency - self.latency_ewma)
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn(), recording its latency and counting any exception it raises as a failure.
+        DeadlineExceeded is not the endpoint's fault and is passed through unrecorded.
+        """
+        start = time.monotonic()
+        try:
+            result = fn()
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            self.record(time.monotonic() - start, False)
+            raise
+        self.record(time.monotonic() - start, True)
+        return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """asyncio counterpart of call()."""
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            self.record(time.monotonic() - start, False)
+            raise
+        self.record(time.monotonic() - start, True)
+        return result
+
+    def __str__(self) -> str:
+        latency = f"{self.latency_ewma * 1000:.1f}ms" if self.latency_ewma is not None else "None"
+        return (f"EndpointHealth: Name={self.name}, State={self.state}, LatencyEwma={latency}, "
+                f"Calls={self.calls}, Failures={self.failures}")
+
+
+def call_with_failover(
+    primary_health: EndpointHealth,
+    primary: Callable[[], Any],
+    backup_health: EndpointHealth,
+    backup: Callable[[], Any],
+    hedge_delay: Optional[float] = None,
+    executor: Optional[Executor] = None,
+) -> Any:
+    """
+    Call primary() and fall back to backup() when it raises, skipping the primary entirely while its
+    circuit breaker is open. The backup is the last resort and is always attempted.
+
+    With hedge_delay and an executor, the primary runs on the executor and the backup is also fired
+    if the primary has not finished after hedge_delay seconds; the first successful result wins and
+    the slower call is left to finish in the background.
+
+    Raises:
+        The backup's exception when both calls fail, with the primary's exception as its __cause__
+        (None when the primary was skipped).
+    """
+    if not primary_health.allow_request():
+        return backup_health.call(backup)
+
+    if hedge_delay is None or executor is None:
+        try:
+            return primary_health.call(primary)
+        except Exception as primary_exc:
+            return _call_backup(backup_health, backup, primary_exc)
+
+    first = executor.submit(primary_health.call, primary)
+    done, _ = wait((first,), timeout=hedge_delay)
+    if done:
+        try:
+            return first.result()
+        except Exception as primary_exc:
+            return _call_backup(backup_health, backup, primary_exc)
+
+    second = executor.submit(backup_health.call, backup)
+    pending = {first, second}
+    errors = {}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as exc:
+                errors[future] = exc
+    raise errors[second] from errors[first]
+
+
+def _call_backup(backup_health: EndpointHealth, backup: Callable[[], Any], primary_exc: Exception) -> Any:
+    try:
+        return backup_health.call(backup)
+    except Exception as backup_exc:
+        raise backup_exc from primary_exc
+
+
+async def call_with_failover_async(
+    primary_health: EndpointHealth,
+    primary: Callable[[], Awaitable[Any]],
+    backup_health: EndpointHealth,
+    backup: Callable[[], Awaitable[Any]],
+) -> Any:
+    """asyncio counterpart of call_with_failover() without hedging."""
+    if not primary_health.allow_request():
+        return await backup_health.call_async(backup)
+    try:
+        return await primary_health.call_async(primary)
+    except Exception as primary_exc:
+        try:
+            return await backup_health.call_async(backup)
+        except Exception as backup_exc:
+            raise backup_exc from primary_exc
@@ -0,0 +1,280 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import threading
+import time
+
+# Per-lookup timings reported by the clients, in seconds
+PHASES = ("total", "connect", "ttfb", "read", "parse", "decode")
+
+
+@dataclass
+class LookupMetrics:
+    """
+    What happened during one get_best_match() call.
+
+    client: "rest", "rest-async" or "soap".
+    source: "network", "cache", "zip_index" (offline index, also used when both endpoints failed) or
+            "coalesced" (answered by a concurrent identical call).
+    endpoint: "primary", "backup" or "trial" for the endpoint that served the answer; None otherwise.
+    attempts: Lookups sent through the failover chain (1 + retries); 0 when no request was made.
+    error_number: Error.Number of the response, or of the error payload that failed the lookup.
+    exception: Class name of the exception raised to the caller, if any.
+    total, connect, ttfb, read, parse, decode: Seconds spent in the whole call, opening connections,
+        waiting for the response headers, reading the body, parsing it and decoding it into models.
+        Phases that a client cannot observe stay 0.0 (see the readme).
+    """
+    client: str
+    source: str = "network"
+    endpoint: Optional[str] = None
+    attempts: int = 0
+    error_number: Optional[str] = None
+    exception: Optional[str] = None
+    total: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    read: float = 0.0
+    parse: float = 0.0
+    decode: float = 0.0
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+    def served(self, endpoint: str, connect: float, ttfb: float, read: float, parse: float) -> None:
+        """Record the endpoint that answered and its network/parse timings; the first answer wins."""
+        if self.endpoint is None:
+            self.endpoint = endpoint
+            self.connect, self.ttfb, self.read, self.parse = connect, ttfb, read, parse
+
+    def __str__(self) -> str:
+        return (f"LookupMetrics: Client={self.client}, Source={self.source}, Endpoint={self.endpoint}, "
+                f"Attempts={self.attempts}, ErrorNumber={self.error_number}, Exception={self.exception}, "
+                f"Total={self.total * 1000:.2f}ms, Connect={self.connect * 1000:.2f}ms, "
+                f"Ttfb={self.ttfb * 1000:.2f}ms, Read={self.read * 1000:.2f}ms, "
+                f"Parse={self.parse * 1000:.2f}ms, Decode={self.decode * 1000:.2f}ms")
+
+
+class Metrics:
+    """
+    Receiver of LookupMetrics. Pass an instance as the metrics argument of a client; clients without
+    one skip every timer, so instrumentation costs nothing when it is disabled.
+    """
+
+    def record(self, lookup: LookupMetrics) -> None:
+        pass
+
+
+class CallbackMetrics(Metrics):
+    def __init__(self, callback: Callable[[LookupMetrics], None]):
+        """Call callback(lookup) after every lookup, on the thread (or event loop) that made it."""
+        self.callback = callback
+
+    def record(self, lookup: LookupMetrics) -> None:
+        self.callback(lookup)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PrometheusMetrics(Metrics):
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, namespace: str = "fasttax"):
+        """
+        Aggregates lookups into Prometheus counters and histograms, without depending on a Prometheus
+        client library. Serve render() from your /metrics endpoint.
+
+        buckets: Upper bounds, in seconds, of the phase latency histogram buckets.
+        namespace: Prefix of every metric name.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._lookups: Dict[Tuple[str, ...], int] = {}
+        self._retries: Dict[Tuple[str, ...], int] = {}
+        self._histograms: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, lookup: LookupMetrics) -> None:
+        error = lookup.exception or lookup.error_number or ""
+        lookup_key = (lookup.client, lookup.source, lookup.endpoint or "", error)
+        with self._lock:
+            self._lookups[lookup_key] = self._lookups.get(lookup_key, 0) + 1
+            if lookup.attempts > 1:
+                self._retries[(lookup.client,)] = self._retries.get((lookup.client,), 0) + lookup.retries
+            for phase in PHASES:
+                seconds = getattr(lookup, phase)
+                if phase != "total" and not seconds:
+                    continue
+                histogram = self._histograms.get((lookup.client, phase))
+                if histogram is None:
+                    # Bucket counts, then sum and count
+                    histogram = self._histograms[(lookup.client, phase)] = [0] * len(self.buckets) + [0.0, 0]
+                for position, bound in enumerate(self.buckets):
+                    if seconds <= bound:
+                        histogram[position] += 1
+                histogram[-2] += seconds
+                histogram[-1] += 1
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        name = self.namespace
+        lines = [
+            f"# HELP {name}_lookups_total GetBestMatch lookups by client, source, serving endpoint and error.",
+            f"# TYPE {name}_lookups_total counter",
+        ]
+        with self._lock:
+            for (client, source, endpoint, error), count in sorted(self._lookups.items()):
+                lines.append(f'{name}_lookups_total{{client="{client}",source="{source}",'
+                             f'endpoint="{endpoint}",error="{_escape(error)}"}} {count}')
+            lines += [
+                f"# HELP {name}_retries_total Lookups re-sent after no endpoint could answer.",
+                f"# TYPE {name}_retries_total counter",
+            ]
+            for (client,), count in sorted(self._retries.items()):
+                lines.append(f'{name}_retries_total{{client="{client}"}} {count}')
+            lines += [
+                f"# HELP {name}_lookup_seconds Time spent per lookup phase.",
+                f"# TYPE {name}_lookup_seconds histogram",
+            ]
+            for (client, phase), histogram in sorted(self._histograms.items()):
+                labels = f'client="{client}",phase="{phase}"'
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f'{name}_lookup_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_lookup_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f"{name}_lookup_seconds_sum{{{labels}}} {histogram[-2]}")
+                lines.append(f"{name}_lookup_seconds_count{{{labels}}} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class OpenTelemetryMetrics(Metrics):
+    def __init__(self, meter: Any = None):
+        """
+        Reports lookups through the OpenTelemetry metrics API (requires the opentelemetry-api package).
+
+        meter: Meter to create the instruments on; defaults to the global meter provider's "fasttax" meter.
+        """
+        if meter is None:
+            from opentelemetry import metrics
+
+            meter = metrics.get_meter("fasttax")
+        self._lookups = meter.create_counter("fasttax.lookups", description="GetBestMatch lookups")
+        self._retries = meter.create_counter("fasttax.retries", description="Lookups re-sent after a failure")
+        self._duration = meter.create_histogram("fasttax.lookup.duration", unit="s",
+                                                description="Time spent per lookup phase")
+
+    def record(self, lookup: LookupMetrics) -> None:
+        attributes = {
+            "client": lookup.client,
+            "source": lookup.source,
+            "endpoint": lookup.endpoint or "",
+            "error": lookup.exception or lookup.error_number or "",
+        }
+        self._lookups.add(1, attributes)
+        if lookup.attempts > 1:
+            self._retries.add(lookup.retries, {"client": lookup.client})
+        for phase in PHASES:
+            seconds = getattr(lookup, phase)
+            if phase == "total" or seconds:
+                self._duration.record(seconds, {"client": lookup.client, "phase": phase})
+
+
+# Seconds the current thread spent in connect() (TCP and TLS handshakes) since timed_get() reset it
+_connect_time = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def instrument_adapter(adapter) -> None:
+    """Make a requests HTTPAdapter's connection pools report connect time to timed_get()."""
+    adapter.poolmanager.pool_classes_by_scheme = {
+        "http": _TimedHTTPConnectionPool,
+        "https": _TimedHTTPSConnectionPool,
+    }
+
+
+def aiohttp_trace_config():
+    """
+    aiohttp TraceConfig that adds the time spent opening connections to the connect attribute of the
+    trace_request_ctx passed to a request (e.g., a types.SimpleNamespace(connect=0.0)).
+    """
+    import aiohttp
+
+    async def on_start(session, context, params) -> None:
+        context.connect_started = time.perf_counter()
+
+    async def on_end(session, context, params) -> None:
+        context.trace_request_ctx.connect += time.perf_counter() - context.connect_started
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_start)
+    trace_config.on_connection_create_end.append(on_end)
+    return trace_config
+
+
+def timed_get(session, url: str, params: dict, timeout) -> Tuple[bytes, float, float, float]:
+    """
+    GET url through session and return (body, connect, ttfb, read) in seconds. connect is only
+    measured on sessions whose adapter went through instrument_adapter().
+
+    Raises:
+        requests.RequestException: As session.get() and raise_for_status() do.
+    """
+    return _timed_send(session.get, url, timeout, params=params)
+
+
+def timed_post(
+    session, url: str, data: bytes, headers: dict, timeout, check_status: Optional[Callable] = None
+) -> Tuple[bytes, float, float, float]:
+    """
+    POST data to url through session and return (body, connect, ttfb, read), like timed_get().
+
+    check_status: Called with the response instead of raise_for_status() (e.g., to surface SOAP faults).
+    """
+    return _timed_send(session.post, url, timeout, check_status, data=data, headers=headers)
+
+
+def _timed_send(
+    send: Callable, url: str, timeout, check_status: Optional[Callable] = None, **kwargs
+) -> Tuple[bytes, float, float, float]:
+    _connect_time.seconds = 0.0
+    start = time.perf_counter()
+    response = send(url, timeout=timeout, stream=True, **kwargs)
+    headers_at = time.perf_counter()
+    try:
+        if check_status is not None:
+            check_status(response)
+        else:
+            response.raise_for_status()
+        body = response.content
+    finally:
+        response.close()
+    connect = _connect_time.seconds
+    return body, connect, headers_at - start - connect, time.perf_counter() - headers_at
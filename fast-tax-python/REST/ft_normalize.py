@@ -0,0 +1,129 @@
+from ft_response import GetBestMatchInput
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+# USPS standard abbreviations (Publication 28) for street suffixes, directionals and unit designators
+ADDRESS_ABBREVIATIONS = {
+    "ALLEY": "ALY", "AVENUE": "AVE", "AV": "AVE", "BOULEVARD": "BLVD", "CIRCLE": "CIR", "COURT": "CT",
+    "COVE": "CV", "CROSSING": "XING", "DRIVE": "DR", "EXPRESSWAY": "EXPY", "FREEWAY": "FWY", "HIGHWAY": "HWY",
+    "LANE": "LN", "PARKWAY": "PKWY", "PLACE": "PL", "PLAZA": "PLZ", "POINT": "PT", "ROAD": "RD",
+    "ROUTE": "RTE", "SQUARE": "SQ", "STREET": "ST", "STR": "ST", "TERRACE": "TER", "TRAIL": "TRL",
+    "TURNPIKE": "TPKE",
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+    "APARTMENT": "APT", "BUILDING": "BLDG", "DEPARTMENT": "DEPT", "FLOOR": "FL", "ROOM": "RM",
+    "SUITE": "STE",
+}
+
+STATE_ABBREVIATIONS = {
+    "ALABAMA": "AL", "ALASKA": "AK", "ARIZONA": "AZ", "ARKANSAS": "AR", "CALIFORNIA": "CA", "COLORADO": "CO",
+    "CONNECTICUT": "CT", "DELAWARE": "DE", "DISTRICT OF COLUMBIA": "DC", "FLORIDA": "FL", "GEORGIA": "GA",
+    "HAWAII": "HI", "IDAHO": "ID", "ILLINOIS": "IL", "INDIANA": "IN", "IOWA": "IA", "KANSAS": "KS",
+    "KENTUCKY": "KY", "LOUISIANA": "LA", "MAINE": "ME", "MARYLAND": "MD", "MASSACHUSETTS": "MA",
+    "MICHIGAN": "MI", "MINNESOTA": "MN", "MISSISSIPPI": "MS", "MISSOURI": "MO", "MONTANA": "MT",
+    "NEBRASKA": "NE", "NEVADA": "NV", "NEW HAMPSHIRE": "NH", "NEW JERSEY": "NJ", "NEW MEXICO": "NM",
+    "NEW YORK": "NY", "NORTH CAROLINA": "NC", "NORTH DAKOTA": "ND", "OHIO": "OH", "OKLAHOMA": "OK",
+    "OREGON": "OR", "PENNSYLVANIA": "PA", "PUERTO RICO": "PR", "RHODE ISLAND": "RI", "SOUTH CAROLINA": "SC",
+    "SOUTH DAKOTA": "SD", "TENNESSEE": "TN", "TEXAS": "TX", "UTAH": "UT", "VERMONT": "VT", "VIRGINIA": "VA",
+    "WASHINGTON": "WA", "WEST VIRGINIA": "WV", "WISCONSIN": "WI", "WYOMING": "WY",
+}
+
+# Punctuation that never changes what an address means; "#" is split off ("#4B" -> "# 4B")
+_PUNCTUATION = re.compile(r"[.,;]")
+_HASH = re.compile(r"#\s*")
+
+# Canonical fields, in make_key() order
+KEY_FIELDS = ("Address", "Address2", "City", "State", "Zip", "TaxType")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Upper-case and collapse whitespace."""
+    return " ".join(value.split()).upper() if value else ""
+
+
+def normalize_address(value: Optional[str]) -> str:
+    """Canonical address line: upper-cased, unpunctuated, with USPS suffix/directional/unit abbreviations."""
+    if not value:
+        return ""
+    value = _HASH.sub("# ", _PUNCTUATION.sub(" ", value.upper()))
+    return " ".join(ADDRESS_ABBREVIATIONS.get(word, word) for word in value.split())
+
+
+def normalize_city(value: Optional[str]) -> str:
+    """Canonical city: upper-cased and unpunctuated ("St. Louis" -> "ST LOUIS")."""
+    return normalize_text(_PUNCTUATION.sub(" ", value)) if value else ""
+
+
+def normalize_state(value: Optional[str]) -> str:
+    """Two-letter state code for a state name or code ("california" -> "CA")."""
+    state = normalize_city(value)
+    return STATE_ABBREVIATIONS.get(state, state)
+
+
+def normalize_zip(value: Optional[str]) -> str:
+    """Five-digit ZIP code; ZIP+4 suffixes and separators are dropped ("93101-1234" -> "93101")."""
+    return "".join(ch for ch in (value or "") if ch.isdigit())[:5]
+
+
+def normalize_tax_type(value: Optional[str]) -> str:
+    """Lower-cased tax type ("Sales" -> "sales")."""
+    return " ".join(value.split()).lower() if value else ""
+
+
+def make_key(
+    address: Optional[str],
+    address2: Optional[str],
+    city: Optional[str],
+    state: Optional[str],
+    zip: Optional[str],
+    tax_type: Optional[str],
+) -> Tuple[str, ...]:
+    """
+    Return the canonical (Address, Address2, City, State, Zip, TaxType) of a lookup. Inputs that differ
+    only in case, whitespace, punctuation, spelled-out suffixes or state names, or a ZIP+4 suffix share
+    a key, and the key's values are themselves valid GetBestMatch arguments.
+    """
+    return (
+        normalize_address(address),
+        normalize_address(address2),
+        normalize_city(city),
+        normalize_state(state),
+        normalize_zip(zip),
+        normalize_tax_type(tax_type),
+    )
+
+
+def input_key(item: GetBestMatchInput) -> Tuple:
+    """Dedup key of a GetBestMatchInput: its make_key() plus LicenseKey and IsLive."""
+    return make_key(item.Address, item.Address2, item.City, item.State, item.Zip, item.TaxType) + (
+        item.LicenseKey, item.IsLive
+    )
+
+
+def normalize_input(item: GetBestMatchInput) -> GetBestMatchInput:
+    """Return a copy of item with its address fields and TaxType canonicalized (see make_key())."""
+    key = make_key(item.Address, item.Address2, item.City, item.State, item.Zip, item.TaxType)
+    return replace(item, **dict(zip(KEY_FIELDS, key)))
+
+
+def dedupe_inputs(inputs: Iterable[GetBestMatchInput]) -> Tuple[List[GetBestMatchInput], List[int]]:
+    """
+    Collapse inputs that normalize to the same lookup.
+
+    Returns:
+        tuple: (unique, index). unique holds one normalized input per distinct key, in order of first
+        appearance (keeping that row's TimeoutSeconds); index[i] is the position in unique of the
+        i-th input, so [results[j] for j in index] fans the unique results back out.
+    """
+    positions: Dict[Tuple, int] = {}
+    unique: List[GetBestMatchInput] = []
+    index: List[int] = []
+    for item in inputs:
+        key = input_key(item)
+        position = positions.get(key)
+        if position is None:
+            position = positions[key] = len(unique)
+            unique.append(normalize_input(item))
+        index.append(position)
+    return unique, index
@@ -0,0 +1,292 @@
+from ft_retry import Deadline, DeadlineExceeded
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import multiprocessing
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, qps: float, burst: Optional[float] = None):
+        """
+        Token bucket that spaces requests out to at most qps per second. Thread-safe, and usable from
+        asyncio code through acquire_async(); share one instance between every client that draws on
+        the same license.
+
+        Callers reserve their token up front and sleep until its slot comes, so waiters are served
+        in arrival order without polling.
+
+        qps: Requests per second.
+        burst: Bucket size, the most requests that may go out back to back (defaults to qps, at least 1).
+        """
+        if qps <= 0:
+            raise ValueError("qps must be positive")
+        self.qps = qps
+        self.burst = burst if burst is not None else max(1.0, qps)
+        self.waited = 0.0
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, deadline: Optional[Deadline]) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.qps) - 1.0
+            wait = -tokens / self.qps if tokens < 0 else 0.0
+            _check_deadline(deadline, wait)
+            self._tokens, self._updated_at = tokens, now
+            self.waited += wait
+            return wait
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Wait for a token.
+
+        Raises:
+            DeadlineExceeded: If deadline would run out before the token's slot (no token is taken).
+        """
+        wait = self._reserve(deadline)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, deadline: Optional[Deadline] = None) -> None:
+        """acquire() without blocking the event loop."""
+        wait = self._reserve(deadline)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def __str__(self) -> str:
+        return f"RateLimiter: Qps={self.qps}, Burst={self.burst}, Waited={self.waited:.2f}s"
+
+
+class SharedRateLimiter(RateLimiter):
+    def __init__(self, qps: float, burst: Optional[float] = None, context: Any = None):
+        """
+        RateLimiter whose bucket lives in shared memory, so processes that inherit it (e.g., the
+        workers of ft_sharded.ShardedExecutor) draw from one global budget.
+
+        context: multiprocessing context used to allocate the shared state (defaults to the default one).
+        """
+        super().__init__(qps, burst)
+        context = context or multiprocessing.get_context()
+        # Tokens left and when they were counted
+        self._state = context.Array("d", [self.burst, time.monotonic()])
+
+    def _reserve(self, deadline: Optional[Deadline]) -> float:
+        with self._state.get_lock():
+            now = time.monotonic()
+            tokens = min(self.burst, self._state[0] + (now - self._state[1]) * self.qps) - 1.0
+            wait = -tokens / self.qps if tokens < 0 else 0.0
+            _check_deadline(deadline, wait)
+            self._state[0], self._state[1] = tokens, now
+            return wait
+
+    def __getstate__(self) -> dict:
+        # Passed to spawned processes; the shared Array travels, the process-local lock does not
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _check_deadline(deadline: Optional[Deadline], wait: float) -> None:
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None and remaining <= wait:
+        raise DeadlineExceeded("FastTax lookup deadline exceeded waiting for the rate limit")
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.5,
+    ):
+        """
+        Caps the requests in flight with a limit tuned by AIMD (additive increase, multiplicative
+        decrease), so callers get the most throughput the service sustains without being throttled.
+
+        Every healthy response grows the limit by 1 / limit, about +1 per round trip. A failed request
+        (network error, HTTP error or Error.Number 4) or one slower than latency_tolerance times the
+        baseline latency multiplies it by backoff_ratio, at most once per round trip. The baseline
+        tracks the fastest recent response. Thread-safe, and usable from asyncio code through
+        acquire_async(); share one instance between the clients that call the same service.
+
+        initial_limit, min_limit, max_limit: Starting value and bounds of the limit.
+        latency_tolerance: Latency, as a multiple of the baseline, that counts as congestion.
+        backoff_ratio: Factor applied to the limit on congestion (0 < ratio < 1).
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.in_flight = 0
+        self.decreases = 0
+        self._baseline: Optional[float] = None
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < max(int(self.limit), 1):
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Wait for a free slot; every acquire() must be paired with a release() or cancel().
+
+        Raises:
+            DeadlineExceeded: If deadline runs out first.
+        """
+        with self._condition:
+            while not self._try_acquire():
+                remaining = deadline.remaining() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineExceeded("FastTax lookup deadline exceeded waiting for a concurrency slot")
+                self._condition.wait(remaining)
+
+    async def acquire_async(self, deadline: Optional[Deadline] = None) -> None:
+        """acquire() without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_acquire():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded("FastTax lookup deadline exceeded waiting for a concurrency slot")
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded("FastTax lookup deadline exceeded waiting for a concurrency slot") from None
+
+    def release(self, latency: float, failed: bool = False) -> None:
+        """Free a slot and adjust the limit from the request's latency (seconds) and outcome."""
+        with self._lock:
+            if not failed:
+                # The baseline drops to any faster response and drifts slowly up towards slower ones
+                if self._baseline is None or latency < self._baseline:
+                    self._baseline = latency
+                else:
+                    self._baseline += (latency - self._baseline) * 0.01
+            congested = failed or latency > self._baseline * self.latency_tolerance
+            now = time.monotonic()
+            if not congested:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif now - self._decreased_at >= max(latency, self._baseline or 0.0):
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self.decreases += 1
+                self._decreased_at = now
+            waiters = self._free_slot()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def cancel(self) -> None:
+        """Free a slot without adjusting the limit, for a request that says nothing about the service."""
+        with self._lock:
+            waiters = self._free_slot()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def _free_slot(self) -> List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]:
+        # Called with the lock held; returns the asyncio waiters to wake once it is released
+        self.in_flight -= 1
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        return waiters
+
+    def __str__(self) -> str:
+        baseline = f"{self._baseline * 1000:.2f}ms" if self._baseline is not None else None
+        return (f"AdaptiveConcurrency: Limit={self.limit:.2f}, InFlight={self.in_flight}, "
+                f"Baseline={baseline}, Decreases={self.decreases}")
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def call_limited(
+    fn: Callable[[], Any],
+    rate_limiter: Optional[RateLimiter],
+    concurrency: Optional[AdaptiveConcurrency],
+    deadline: Optional[Deadline] = None,
+    failed: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """
+    Run fn() (one request) inside a concurrency slot once the rate limiter allows it, and report its
+    latency and outcome to concurrency. A result is a failure when it raises or failed(result) is true;
+    DeadlineExceeded (the caller's budget ran out, before or while sending) frees the slot unreported.
+
+    Raises:
+        DeadlineExceeded: If deadline runs out while waiting for a slot or a token.
+    """
+    if concurrency is None:
+        if rate_limiter is not None:
+            rate_limiter.acquire(deadline)
+        return fn()
+    concurrency.acquire(deadline)
+    start = time.perf_counter()
+    ok = False
+    sampled = True
+    try:
+        if rate_limiter is not None:
+            rate_limiter.acquire(deadline)
+            start = time.perf_counter()
+        result = fn()
+        ok = failed is None or not failed(result)
+        return result
+    except DeadlineExceeded:
+        sampled = False
+        raise
+    finally:
+        if sampled:
+            concurrency.release(time.perf_counter() - start, not ok)
+        else:
+            concurrency.cancel()
+
+
+async def call_limited_async(
+    fn: Callable[[], Awaitable[Any]],
+    rate_limiter: Optional[RateLimiter],
+    concurrency: Optional[AdaptiveConcurrency],
+    deadline: Optional[Deadline] = None,
+    failed: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """asyncio counterpart of call_limited()."""
+    if concurrency is None:
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async(deadline)
+        return await fn()
+    await concurrency.acquire_async(deadline)
+    start = time.perf_counter()
+    ok = False
+    sampled = True
+    try:
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async(deadline)
+            start = time.perf_counter()
+        result = await fn()
+        ok = failed is None or not failed(result)
+        return result
+    except (DeadlineExceeded, asyncio.CancelledError):
+        # A cancelled task tells no more about the service than a spent deadline
+        sampled = False
+        raise
+    finally:
+        if sampled:
+            concurrency.release(time.perf_counter() - start, not ok)
+        else:
+            concurrency.cancel()
@@ -1,7 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Optional, List
 
 
+def _slots(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields, as dataclass(slots=True) does on Python 3.10+.
+    Response models are created by the thousand on hot paths; slots make them smaller and faster to build.
+    """
+    names = tuple(field.name for field in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
 @dataclass
 class GetBestMatchInput:
     Address: Optional[str] = None
@@ -20,6 +32,7 @@ class GetBestMatchInput:
                 f"IsLive={self.IsLive}, TimeoutSeconds={self.TimeoutSeconds}")
 
 
+@_slots
 @dataclass
 class InformationComponent:
     Name: Optional[str] = None
@@ -29,6 +42,7 @@ class InformationComponent:
         return f"InformationComponent: Name={self.Name}, Value={self.Value}"
 
 
+@_slots
 @dataclass
 class Error:
     Desc: Optional[str] = None
@@ -39,6 +53,7 @@ class Error:
         return f"Error: Desc={self.Desc}, Number={self.Number}, Location={self.Location}"
 
 
+@_slots
 @dataclass
 class BestMatchTaxInfo:
     Zip: Optional[str] = None
@@ -73,6 +88,7 @@ class BestMatchTaxInfo:
                 f"NotesCodes={self.NotesCodes}, NotesDesc={self.NotesDesc}")
 
 
+@_slots
 @dataclass
 class GetBestMatchResponse:
     TaxInfoItems: Optional[List['BestMatchTaxInfo']] = None
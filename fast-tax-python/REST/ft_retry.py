@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional, Type
+import asyncio
+import random
+import time
+
+
+class ServiceUnavailable(RuntimeError):
+    """Raised when no endpoint could answer (network failures or Error.Number 4); safe to retry."""
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when the overall deadline of a lookup runs out before an answer was received."""
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Overall time budget of one lookup, shared by the primary, backup and retry attempts.
+
+        seconds: Total budget; None means no deadline.
+        """
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def clip(self, timeout: float) -> float:
+        """
+        Return timeout capped to the remaining budget.
+
+        Raises:
+            DeadlineExceeded: If the budget is already spent.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("FastTax lookup deadline exceeded")
+        return min(timeout, remaining)
+
+    @contextmanager
+    def timeouts(self, *exceptions: Type[BaseException]) -> Iterator[None]:
+        """
+        Re-raise the given timeout exceptions as DeadlineExceeded once the budget is spent. A request
+        whose timeout was clipped to fit the deadline then fails as the caller's deadline, and circuit
+        breakers never count it against the endpoint.
+        """
+        try:
+            yield
+        except exceptions as exc:
+            _raise_if_expired(self, exc)
+            raise
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, backoff_base: float = 0.05, backoff_max: float = 1.0):
+        """
+        Exponential backoff with full jitter for lookups that failed with ServiceUnavailable.
+        Retries never outlive the lookup's Deadline.
+
+        max_attempts: Total attempts, including the first one.
+        backoff_base: Backoff ceiling in seconds before the first retry; doubles with every retry.
+        backoff_max: Upper bound of the backoff ceiling.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retrying after the given (1-based) failed attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def next_delay(self, attempt: int, deadline: Deadline) -> Optional[float]:
+        """Backoff before the next attempt, or None when attempts or the deadline are exhausted."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+def _raise_if_expired(deadline: Deadline, exc: Exception) -> None:
+    remaining = deadline.remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("FastTax lookup deadline exceeded") from exc
+
+
+def call_with_retry(fn: Callable[[], Any], policy: Optional[RetryPolicy], deadline: Deadline) -> Any:
+    """
+    Call fn(), retrying on ServiceUnavailable as allowed by policy and deadline.
+
+    Raises:
+        ServiceUnavailable: When the last allowed attempt fails.
+        DeadlineExceeded: When an attempt fails after the deadline has run out.
+    """
+    attempt = 1
+    while True:
+        try:
+            return fn()
+        except ServiceUnavailable as exc:
+            _raise_if_expired(deadline, exc)
+            delay = policy.next_delay(attempt, deadline) if policy is not None else None
+            if delay is None:
+                raise
+        time.sleep(delay)
+        attempt += 1
+
+
+async def call_with_retry_async(
+    fn: Callable[[], Awaitable[Any]],
+    policy: Optional[RetryPolicy],
+    deadline: Deadline,
+) -> Any:
+    """asyncio counterpart of call_with_retry()."""
+    attempt = 1
+    while True:
+        try:
+            return await fn()
+        except ServiceUnavailable as exc:
+            _raise_if_expired(deadline, exc)
+            delay = policy.next_delay(attempt, deadline) if policy is not None else None
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,207 @@
+from ft_response import GetBestMatchInput, GetBestMatchResponse, BestMatchTaxInfo, InformationComponent, Error
+from ft_cache import ResultCache
+from ft_zip_index import ZipRateIndex
+from ft_retry import DeadlineExceeded, ServiceUnavailable
+from ft_rate_limit import AdaptiveConcurrency, SharedRateLimiter
+from get_best_match_rest import FastTaxClient
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Union
+import multiprocessing
+import os
+
+# BestMatchTaxInfo fields in constructor order; rows travel between processes as plain tuples in this order
+_TAX_INFO_FIELDS = tuple(field.name for field in fields(BestMatchTaxInfo))
+_COMPONENTS_POSITION = _TAX_INFO_FIELDS.index("InformationComponents")
+
+# Exceptions rebuilt with their own type in the parent; any other is re-raised as a RuntimeError
+_EXCEPTIONS = {cls.__name__: cls for cls in (ServiceUnavailable, DeadlineExceeded, RuntimeError, ValueError)}
+
+
+# Per-process state of a worker, set up once by _init_worker()
+_worker_client: Optional[FastTaxClient] = None
+
+
+def _init_worker(
+    client_options: Dict[str, Any],
+    cache_size: int,
+    zip_index_path: Optional[str],
+    rate_limiter: Optional[SharedRateLimiter],
+    adaptive_limit: int,
+) -> None:
+    global _worker_client
+    options = dict(client_options)
+    if cache_size:
+        options["cache"] = ResultCache(max_size=cache_size)
+    if zip_index_path:
+        options["zip_index"] = ZipRateIndex(zip_index_path)
+    if adaptive_limit:
+        options["concurrency_limiter"] = AdaptiveConcurrency(adaptive_limit, max_limit=adaptive_limit)
+    _worker_client = FastTaxClient(rate_limiter=rate_limiter, **options)
+
+
+def _encode(result: Union[GetBestMatchResponse, Exception]) -> tuple:
+    """Flatten a result into nested tuples, which pickle far smaller and faster than dataclasses."""
+    if isinstance(result, Exception):
+        return (None, type(result).__name__, str(result))
+    items = tuple(
+        tuple(
+            tuple((component.Name, component.Value) for component in value)
+            if position == _COMPONENTS_POSITION else value
+            for position, value in enumerate(map(item.__getattribute__, _TAX_INFO_FIELDS))
+        )
+        for item in result.TaxInfoItems or ()
+    )
+    error = result.Error
+    return (
+        items,
+        result.MatchLevel,
+        (error.Desc, error.Number, error.Location) if error else None,
+        tuple(result.Debug or ()),
+    )
+
+
+def _decode(encoded: tuple) -> Union[GetBestMatchResponse, Exception]:
+    if encoded[0] is None:
+        _, name, message = encoded
+        cls = _EXCEPTIONS.get(name)
+        return cls(message) if cls is not None else RuntimeError(f"{name}: {message}")
+    items, match_level, error, debug = encoded
+    tax_info_items = []
+    for row in items:
+        row = list(row)
+        row[_COMPONENTS_POSITION] = [InformationComponent(name, value) for name, value in row[_COMPONENTS_POSITION]]
+        tax_info_items.append(BestMatchTaxInfo(*row))
+    return GetBestMatchResponse(tax_info_items, match_level, Error(*error) if error else None, list(debug))
+
+
+def _run_batch(inputs: List[GetBestMatchInput], concurrency: int, dedupe: bool) -> List[tuple]:
+    return [_encode(result) for result in _worker_client.get_best_match_batch(inputs, concurrency, dedupe)]
+
+
+class ShardedExecutor:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        client_options: Optional[Dict[str, Any]] = None,
+        concurrency: int = 8,
+        batch_size: int = 256,
+        max_pending_batches: Optional[int] = None,
+        cache_size: int = 0,
+        zip_index_path: Optional[str] = None,
+        rate_limit_qps: Optional[float] = None,
+        rate_limit_burst: Optional[float] = None,
+        dedupe: bool = False,
+        adaptive: bool = False,
+        mp_context: Any = None,
+    ):
+        """
+        Runs GetBestMatch lookups on a pool of worker processes, so JSON decoding and model building
+        use every core instead of contending for one GIL.
+
+        Inputs are cut into batches of batch_size consecutive rows. Each worker process owns a
+        FastTaxClient (its own connection pool and cache) and runs a batch with concurrency threads;
+        the results come back as flat tuples and are rebuilt into GetBestMatchResponse objects in
+        input order. At most max_pending_batches batches are queued or running, so inputs are read
+        only as fast as results are consumed.
+
+        workers: Worker processes (defaults to os.cpu_count()).
+        client_options: Keyword arguments of each worker's FastTaxClient (URLs, timeouts, retry, ...);
+                        they must be picklable. pool_maxsize defaults to concurrency.
+        concurrency: Lookups in flight per worker.
+        batch_size: Inputs sent to a worker at a time.
+        max_pending_batches: Back-pressure bound (defaults to 2 * workers).
+        cache_size: Size of each worker's ResultCache (0 disables it).
+        zip_index_path: ZipRateIndex file opened by every worker.
+        rate_limit_qps, rate_limit_burst: Global requests-per-second budget shared by all workers, to
+                                          stay within the license's QPS (None for no limit).
+        dedupe: Look up equivalent inputs of a batch once (see FastTaxClient.get_best_match_batch()).
+        adaptive: Give each worker an ft_rate_limit.AdaptiveConcurrency capped at concurrency, so a worker
+                  backs off when the service slows down or fails.
+        mp_context: multiprocessing context (e.g., multiprocessing.get_context("spawn")).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches or 2 * self.workers
+        self.dedupe = dedupe
+        options = {"pool_maxsize": max(concurrency, 10)}
+        options.update(client_options or {})
+        if options.get("raw"):
+            raise ValueError("ShardedExecutor workers return GetBestMatchResponse objects; raw is not supported")
+        context = mp_context or multiprocessing.get_context()
+        self.rate_limiter = SharedRateLimiter(rate_limit_qps, rate_limit_burst, context) if rate_limit_qps else None
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(options, cache_size, zip_index_path, self.rate_limiter, concurrency if adaptive else 0),
+        )
+        # Batches submitted and not yet finished, cancelled by close()
+        self._futures: Set[Future] = set()
+
+    def close(self) -> None:
+        """Cancel the batches that have not started and stop the worker processes."""
+        # Cancelled by hand: shutdown(cancel_futures=True) needs Python 3.9
+        for future in list(self._futures):
+            future.cancel()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ShardedExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def iter_best_match_batch(
+        self,
+        inputs: Iterable[GetBestMatchInput],
+        concurrency: Optional[int] = None,
+        dedupe: Optional[bool] = None
+    ) -> Iterator[Union[GetBestMatchResponse, Exception]]:
+        """
+        Lazily run GetBestMatch for every input on the worker processes, yielding results in input
+        order: the GetBestMatchResponse, or the exception raised for that input. Same interface as
+        FastTaxClient.iter_best_match_batch(), so it can drive ft_bulk.run_bulk().
+
+        concurrency, dedupe: Per-call overrides of the per-worker concurrency and dedupe settings.
+
+        Raises:
+            concurrent.futures.process.BrokenProcessPool: If a worker process died.
+        """
+        concurrency = self.concurrency if concurrency is None else concurrency
+        dedupe = self.dedupe if dedupe is None else dedupe
+        pending: "deque[Future]" = deque()
+        batch: List[GetBestMatchInput] = []
+        for item in inputs:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                pending.append(self._submit(batch, concurrency, dedupe))
+                batch = []
+                if len(pending) >= self.max_pending_batches:
+                    yield from map(_decode, pending.popleft().result())
+        if batch:
+            pending.append(self._submit(batch, concurrency, dedupe))
+        while pending:
+            yield from map(_decode, pending.popleft().result())
+
+    def _submit(self, batch: List[GetBestMatchInput], concurrency: int, dedupe: bool) -> Future:
+        future = self._pool.submit(_run_batch, batch, concurrency, dedupe)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def get_best_match_batch(
+        self,
+        inputs: Iterable[GetBestMatchInput],
+        concurrency: Optional[int] = None,
+        dedupe: Optional[bool] = None
+    ) -> List[Union[GetBestMatchResponse, Exception]]:
+        """Run GetBestMatch for every input on the worker processes and return the results in input order."""
+        return list(self.iter_best_match_batch(inputs, concurrency, dedupe))
+
+    def __str__(self) -> str:
+        qps = self.rate_limiter.qps if self.rate_limiter is not None else None
+        return (f"ShardedExecutor: Workers={self.workers}, Concurrency={self.concurrency}, "
+                f"BatchSize={self.batch_size}, MaxPendingBatches={self.max_pending_batches}, RateLimitQps={qps}")
@@ -0,0 +1,121 @@
+from ft_retry import Deadline, DeadlineExceeded
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesces concurrent identical calls from threads: while a call for a key is in flight,
+        every other caller with the same key waits for it and receives the same result (or exception)
+        instead of issuing its own upstream request. A follower waits no longer than its own deadline,
+        and when the leader runs out of its deadline the followers do not inherit that failure: they
+        join the next call for the key or make it themselves.
+
+        saved: Number of calls that were answered by another caller's in-flight request.
+        """
+        self.saved = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Run fn() unless a call for key is already in flight, in which case wait for and share its result.
+
+        Raises:
+            DeadlineExceeded: If deadline runs out while waiting for another caller's call.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+            remaining = deadline.remaining() if deadline is not None else None
+            if not call.done.wait(max(remaining, 0.0) if remaining is not None else None):
+                raise DeadlineExceeded("FastTax lookup deadline exceeded waiting for a coalesced call")
+            if isinstance(call.error, DeadlineExceeded):
+                # The leader's budget ran out, not necessarily this caller's
+                continue
+            with self._lock:
+                self.saved += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def __str__(self) -> str:
+        return f"SingleFlight: InFlight={len(self._calls)}, Saved={self.saved}"
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        """
+        asyncio counterpart of SingleFlight: concurrent coroutines with the same key share one task.
+        The shared task keeps running if the caller that started it is cancelled. Deadlines are
+        handled as in SingleFlight.
+
+        saved: Number of calls that were answered by another caller's in-flight request.
+        """
+        self.saved = 0
+        self._tasks: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], deadline: Optional[Deadline] = None) -> Any:
+        """
+        Await fn() unless a call for key is already in flight, in which case share its result.
+
+        Raises:
+            DeadlineExceeded: If deadline runs out while waiting for another caller's call.
+        """
+        while True:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(partial(self._forget, key))
+                return await asyncio.shield(task)
+            remaining = deadline.remaining() if deadline is not None else None
+            try:
+                result = await asyncio.wait_for(asyncio.shield(task), remaining)
+            except asyncio.CancelledError:
+                raise
+            except DeadlineExceeded:
+                # The leader's budget ran out, not necessarily this caller's
+                continue
+            except Exception:
+                if not task.done():
+                    # wait_for timed out while the shared call is still running
+                    raise DeadlineExceeded("FastTax lookup deadline exceeded waiting for a coalesced call") from None
+                self.saved += 1
+                raise
+            self.saved += 1
+            return result
+
+    def _forget(self, key: Hashable, task: "asyncio.Future") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def __str__(self) -> str:
+        return f"AsyncSingleFlight: InFlight={len(self._tasks)}, Saved={self.saved}"
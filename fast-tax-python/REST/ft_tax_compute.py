@@ -0,0 +1,269 @@
+from ft_response import GetBestMatchResponse, BestMatchTaxInfo
+from decimal import (Decimal, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR, ROUND_HALF_DOWN, ROUND_HALF_EVEN,
+                     ROUND_HALF_UP, ROUND_UP)
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+
+# Jurisdiction rate fields of BestMatchTaxInfo and the tax columns computed from them
+JURISDICTIONS = {
+    "StateRate": "StateTax",
+    "CountyRate": "CountyTax",
+    "CityRate": "CityTax",
+    "CountyDistrictRate": "CountyDistrictTax",
+    "CityDistrictRate": "CityDistrictTax",
+    "SpecialDistrictRate": "SpecialDistrictTax",
+}
+RATE_FIELDS = ("TaxRate",) + tuple(JURISDICTIONS)
+
+ROUNDING_MODES = (ROUND_HALF_UP, ROUND_HALF_EVEN, ROUND_HALF_DOWN, ROUND_UP, ROUND_DOWN, ROUND_CEILING, ROUND_FLOOR)
+
+
+def _divide_round(values: np.ndarray, divisor: int, rounding: str) -> np.ndarray:
+    """Integer division of values by divisor, rounded like the decimal module's rounding modes."""
+    if divisor == 1:
+        return values
+    quotient, remainder = np.divmod(values, divisor)  # floor division: 0 <= remainder < divisor
+    inexact = remainder > 0
+    negative = values < 0
+    if rounding == ROUND_FLOOR:
+        return quotient
+    if rounding == ROUND_CEILING:
+        return quotient + inexact
+    if rounding == ROUND_DOWN:
+        return quotient + (inexact & negative)
+    if rounding == ROUND_UP:
+        return quotient + (inexact & ~negative)
+    above = 2 * remainder > divisor
+    tie = 2 * remainder == divisor
+    if rounding == ROUND_HALF_UP:
+        return quotient + (above | (tie & ~negative))
+    if rounding == ROUND_HALF_DOWN:
+        return quotient + (above | (tie & negative))
+    if rounding == ROUND_HALF_EVEN:
+        return quotient + (above | (tie & (quotient % 2 == 1)))
+    raise ValueError(f"Unsupported rounding mode: {rounding}")
+
+
+def _to_minor_units(amounts: Any, decimals: int, minor_units: bool = False) -> np.ndarray:
+    """Quantize amounts (NumPy, Arrow or a sequence) to int64 units of 10**-decimals."""
+    if hasattr(amounts, "to_numpy") and not isinstance(amounts, np.ndarray):
+        # pyarrow Array/ChunkedArray; decimal columns come back as Decimal objects
+        amounts = amounts.to_numpy(zero_copy_only=False)
+    values = np.asarray(amounts)
+    if values.dtype == object:
+        _reject_nulls([line for line, value in enumerate(values) if value is None or value != value])
+        quantum = Decimal(1).scaleb(-decimals)
+        return np.fromiter(
+            (int(Decimal(value).quantize(quantum, ROUND_HALF_EVEN).scaleb(decimals)) for value in values),
+            dtype=np.int64, count=len(values),
+        )
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64) if minor_units else values.astype(np.int64) * 10 ** decimals
+    values = values.astype(np.float64)
+    _reject_nulls(np.flatnonzero(np.isnan(values)))
+    return np.rint(values * 10 ** decimals).astype(np.int64)
+
+
+def _reject_nulls(lines: Sequence[int]) -> None:
+    # Nulls (None, NaN, or Arrow nulls after to_numpy()) have no tax; a silent 0 would hide the bad input
+    if len(lines):
+        raise ValueError(f"Amount of line item {lines[0]} is null")
+
+
+def _tax_info_items(result: Any) -> Sequence[Any]:
+    if isinstance(result, GetBestMatchResponse):
+        return result.TaxInfoItems if not result.Error and result.TaxInfoItems else ()
+    if isinstance(result, dict):
+        return result.get("TaxInfoItems") or () if not result.get("Error") else ()
+    return ()
+
+
+def _rate(item: Any, field: str) -> float:
+    value = item.get(field) if isinstance(item, dict) else getattr(item, field)
+    return float(value) if value not in (None, "") else 0.0
+
+
+class TaxComputation:
+    def __init__(
+        self,
+        line: np.ndarray,
+        candidate: np.ndarray,
+        item: np.ndarray,
+        amount: np.ndarray,
+        tax: np.ndarray,
+        jurisdiction_tax: Dict[str, np.ndarray],
+        missing: np.ndarray,
+        items: List[Union[BestMatchTaxInfo, dict]],
+        decimals: int,
+    ):
+        """
+        Taxes computed by compute_tax(): one row per line item and candidate BestMatchTaxInfo, so a
+        ZIP-level match with three TaxInfoItems yields three rows for each of its line items.
+
+        Money columns are exact int64 counts of 10**-decimals units (cents by default); use
+        to_arrow() for decimal columns or divide by 10**decimals for floats.
+
+        line: Index of the line item in the amounts array.
+        candidate: Position of the BestMatchTaxInfo within its response (0 for single matches).
+        item: Index into items of the BestMatchTaxInfo the row was computed from.
+        amount: The line item's amount.
+        tax: Total tax, from TaxRate (or the sum of jurisdiction taxes, see compute_tax()).
+        jurisdiction_tax: StateTax, CountyTax, CityTax, CountyDistrictTax, CityDistrictTax and
+                          SpecialDistrictTax columns.
+        missing: Line items without rates (failed lookups, Error responses or no TaxInfoItems).
+        items: Every BestMatchTaxInfo referenced by item.
+        """
+        self.line = line
+        self.candidate = candidate
+        self.item = item
+        self.amount = amount
+        self.tax = tax
+        self.jurisdiction_tax = jurisdiction_tax
+        self.missing = missing
+        self.items = items
+        self.decimals = decimals
+
+    def __len__(self) -> int:
+        return len(self.line)
+
+    def tax_info(self, row: int) -> Union[BestMatchTaxInfo, dict]:
+        """Return the BestMatchTaxInfo that row was computed from."""
+        return self.items[self.item[row]]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Return every column by name (Line, Candidate, Amount, Tax, StateTax, ...)."""
+        return {
+            "Line": self.line,
+            "Candidate": self.candidate,
+            "Amount": self.amount,
+            "Tax": self.tax,
+            **self.jurisdiction_tax,
+        }
+
+    def to_arrow(self):
+        """Return a pyarrow.Table with the money columns as exact decimal128(18, decimals) values."""
+        import pyarrow as pa
+
+        money = pa.decimal128(18, self.decimals)
+        arrays = {}
+        for name, values in self.columns().items():
+            if name in ("Line", "Candidate"):
+                arrays[name] = pa.array(values)
+                continue
+            # Decimal128 stores the unscaled value as a little-endian 128-bit two's complement integer,
+            # which is exactly the int64 minor-unit count sign-extended to two words.
+            words = np.empty((len(values), 2), dtype=np.int64)
+            words[:, 0] = values
+            words[:, 1] = values >> 63
+            arrays[name] = pa.Array.from_buffers(money, len(values), [None, pa.py_buffer(words)])
+        return pa.table(arrays)
+
+    def __str__(self) -> str:
+        return (f"TaxComputation: Rows={len(self)}, Lines={len(np.unique(self.line))}, "
+                f"Missing={len(self.missing)}, Decimals={self.decimals}")
+
+
+def compute_tax(
+    results: Sequence[Union[GetBestMatchResponse, dict, Exception, None]],
+    amounts: Any,
+    result_index: Any = None,
+    decimals: int = 2,
+    rounding: str = ROUND_HALF_UP,
+    amount_decimals: Optional[int] = None,
+    rate_decimals: int = 6,
+    total_from_jurisdictions: bool = False,
+    minor_units: bool = False,
+) -> TaxComputation:
+    """
+    Compute the total and per-jurisdiction tax of every line item, vectorized with NumPy.
+
+    Amounts and rates are quantized to integers first (amounts to amount_decimals places, rates to
+    rate_decimals places), so every product is exact and rounding to decimals places follows the
+    chosen decimal rounding mode exactly, with no binary floating point error.
+
+    Parameters:
+        results: GetBestMatch results (GetBestMatchResponse or raw dicts); failed lookups (exceptions
+                 or None) and Error responses produce no rows and are listed in missing.
+        amounts: Line item amounts: a NumPy array, a pyarrow Array/ChunkedArray (including decimal
+                 columns) or a sequence. Integer arrays hold whole currency units (see minor_units).
+        result_index: For each line item, the index of its result in results. Omit when results has
+                      one entry per line item.
+        decimals: Decimal places of the computed taxes (2 for cents).
+        rounding: decimal.ROUND_HALF_UP (default), ROUND_HALF_EVEN, ROUND_HALF_DOWN, ROUND_UP,
+                  ROUND_DOWN, ROUND_CEILING or ROUND_FLOOR.
+        amount_decimals: Decimal places of the amounts (defaults to decimals).
+        rate_decimals: Decimal places the rates are quantized to (FastTax rates have at most 6).
+        total_from_jurisdictions: Compute the total as the sum of the rounded jurisdiction taxes
+                                  instead of rounding amount * TaxRate, so the parts always add up.
+        minor_units: Integer amounts already hold units of 10**-amount_decimals (e.g., cents).
+
+    Returns:
+        TaxComputation: One row per line item and candidate BestMatchTaxInfo.
+
+    Raises:
+        ValueError: On mismatched lengths, a null amount or an unsupported rounding mode.
+        OverflowError: If an amount is too large for exact int64 arithmetic.
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+    amount_decimals = decimals if amount_decimals is None else amount_decimals
+    amount_units = _to_minor_units(amounts, amount_decimals, minor_units)
+    if result_index is None:
+        if len(results) != len(amount_units):
+            raise ValueError("results and amounts must have the same length when result_index is omitted")
+        result_index = np.arange(len(amount_units), dtype=np.int64)
+    else:
+        result_index = np.asarray(result_index, dtype=np.int64)
+        if len(result_index) != len(amount_units):
+            raise ValueError("result_index and amounts must have the same length")
+
+    # Flatten every candidate BestMatchTaxInfo into one rate table; offsets/counts locate each result's rows
+    items: List[Any] = []
+    counts = np.zeros(len(results), dtype=np.int64)
+    for position, result in enumerate(results):
+        result_items = _tax_info_items(result)
+        counts[position] = len(result_items)
+        items.extend(result_items)
+    offsets = np.cumsum(counts) - counts
+    scale = 10 ** rate_decimals
+    rates = np.rint(np.array([[_rate(item, field) for field in RATE_FIELDS] for item in items],
+                             dtype=np.float64).reshape(len(items), len(RATE_FIELDS)) * scale).astype(np.int64)
+
+    if len(amount_units) and len(rates):
+        largest_product = int(np.abs(amount_units).max()) * int(np.abs(rates).max())
+        if largest_product >= 2 ** 63:
+            raise OverflowError("Amounts too large for exact int64 tax computation")
+
+    # Expand each line item into one row per candidate of its result
+    line_counts = counts[result_index]
+    line = np.repeat(np.arange(len(amount_units), dtype=np.int64), line_counts)
+    row_starts = np.repeat(np.cumsum(line_counts) - line_counts, line_counts)
+    candidate = np.arange(len(line), dtype=np.int64) - row_starts
+    item = np.repeat(offsets[result_index], line_counts) + candidate
+    amount = amount_units[line]
+    row_rates = rates[item]
+
+    divisor = 10 ** (amount_decimals + rate_decimals - decimals)
+    if divisor < 1:
+        raise ValueError("decimals must not exceed amount_decimals + rate_decimals")
+    jurisdiction_tax = {
+        column: _divide_round(amount * row_rates[:, RATE_FIELDS.index(field)], divisor, rounding)
+        for field, column in JURISDICTIONS.items()
+    }
+    if total_from_jurisdictions:
+        tax = np.sum(list(jurisdiction_tax.values()), axis=0, dtype=np.int64)
+    else:
+        tax = _divide_round(amount * row_rates[:, 0], divisor, rounding)
+
+    return TaxComputation(
+        line=line,
+        candidate=candidate,
+        item=item,
+        amount=_divide_round(amount, 10 ** (amount_decimals - decimals), rounding)
+        if amount_decimals >= decimals else amount * 10 ** (decimals - amount_decimals),
+        tax=tax,
+        jurisdiction_tax=jurisdiction_tax,
+        missing=np.flatnonzero(line_counts == 0),
+        items=items,
+        decimals=decimals,
+    )
@@ -0,0 +1,190 @@
+from ft_response import GetBestMatchInput, GetBestMatchResponse, BestMatchTaxInfo
+from ft_decoder import decode_tax_info, loads
+from ft_normalize import normalize_tax_type, normalize_zip
+from dataclasses import asdict
+from typing import Iterable, List, Optional
+import argparse
+import json
+import sqlite3
+import threading
+import time
+
+ZIP_MATCH_LEVEL = "Zip"
+
+
+class ZipRateIndex:
+    def __init__(
+        self,
+        path: str,
+        max_age_seconds: float = 7 * 24 * 3600,
+        serve_stale_on_failure: bool = True,
+        mmap_size: int = 256 * 1024 * 1024,
+    ):
+        """
+        Persistent index of ZIP-level BestMatchTaxInfo rows keyed by 5-digit ZIP and tax type.
+
+        A ZIP-level answer depends only on Zip + TaxType, so the rows seen in ZIP-level responses
+        can answer later ZIP-only requests without a network call. The index is a SQLite file read
+        through a memory map, shared safely by every thread and by other processes opening the
+        same path.
+
+        path: File that holds the index (created on first use).
+        max_age_seconds: Refresh policy: entries older than this are stale and are no longer served
+                         for ZIP-only requests, which go back to the service and refresh the entry.
+        serve_stale_on_failure: Still serve stale entries when the service cannot be reached.
+        mmap_size: Bytes of the index file to memory-map for reads.
+        """
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self.serve_stale_on_failure = serve_stale_on_failure
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS zip_rates ("
+            " zip TEXT NOT NULL,"
+            " tax_type TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " items TEXT NOT NULL,"
+            " PRIMARY KEY (zip, tax_type)"
+            ") WITHOUT ROWID"
+        )
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
+
+    def get(self, zip: str, tax_type: str, allow_stale: bool = False) -> Optional[GetBestMatchResponse]:
+        """
+        Return a ZIP-level GetBestMatchResponse built from the index, or None when the ZIP/tax type
+        is unknown or its entry is stale and allow_stale is False.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, items FROM zip_rates WHERE zip = ? AND tax_type = ?",
+                (normalize_zip(zip), normalize_tax_type(tax_type)),
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, items = row
+        if not allow_stale and time.time() - fetched_at > self.max_age_seconds:
+            return None
+        return GetBestMatchResponse(
+            TaxInfoItems=[decode_tax_info(item) for item in loads(items)],
+            MatchLevel=ZIP_MATCH_LEVEL,
+        )
+
+    def put(self, zip: str, tax_type: str, tax_info_items: List[BestMatchTaxInfo]) -> None:
+        """Store (or replace) the rows for a ZIP/tax type, stamped with the current time."""
+        zip5 = normalize_zip(zip)
+        if not zip5 or not tax_info_items:
+            return
+        items = json.dumps([asdict(item) for item in tax_info_items], separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO zip_rates (zip, tax_type, fetched_at, items) VALUES (?, ?, ?, ?)",
+                (zip5, normalize_tax_type(tax_type), time.time(), items),
+            )
+
+    def record(self, zip: str, tax_type: str, response: GetBestMatchResponse) -> None:
+        """Store the rows of a response if it is an error-free ZIP-level match."""
+        if response.Error or (response.MatchLevel or "").lower() != ZIP_MATCH_LEVEL.lower():
+            return
+        self.put(zip, tax_type, response.TaxInfoItems)
+
+    def fetched_at(self, zip: str, tax_type: str) -> Optional[float]:
+        """Return the Unix time the entry was stored, or None when it is not indexed."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at FROM zip_rates WHERE zip = ? AND tax_type = ?",
+                (normalize_zip(zip), normalize_tax_type(tax_type)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def stale_zips(self, tax_type: str) -> List[str]:
+        """Return the indexed ZIPs for a tax type whose entries are older than max_age_seconds."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT zip FROM zip_rates WHERE tax_type = ? AND fetched_at < ?",
+                (normalize_tax_type(tax_type), time.time() - self.max_age_seconds),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def warm(
+        self,
+        client,
+        zips: Iterable[str],
+        tax_type: str,
+        license_key: str,
+        is_live: bool = True,
+        concurrency: int = 8,
+        force: bool = False,
+    ) -> int:
+        """
+        Pre-populate the index by looking up every ZIP through client (a FastTaxClient).
+        ZIPs with a fresh entry are skipped unless force is True; pass stale_zips() to refresh.
+
+        Returns:
+            int: Number of ZIPs stored.
+        """
+        def pending() -> Iterable[str]:
+            for zip in zips:
+                zip5 = normalize_zip(zip)
+                if zip5 and (force or self.get(zip5, tax_type) is None):
+                    yield zip5
+
+        requested = []
+
+        def inputs() -> Iterable[GetBestMatchInput]:
+            for zip5 in pending():
+                requested.append(zip5)
+                yield GetBestMatchInput(Zip=zip5, TaxType=tax_type, LicenseKey=license_key, IsLive=is_live)
+
+        stored = 0
+        for position, result in enumerate(client.iter_best_match_batch(inputs(), concurrency)):
+            if isinstance(result, GetBestMatchResponse) and not result.Error and result.TaxInfoItems:
+                self.put(requested[position], tax_type, result.TaxInfoItems)
+                stored += 1
+        return stored
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM zip_rates").fetchone()[0]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or refresh a FastTax ZIP-level rate index.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    warm = subcommands.add_parser("warm", help="Pre-populate the index from a file of ZIP codes (one per line).")
+    warm.add_argument("--index", required=True, help="Index file to create or update.")
+    warm.add_argument("--zips", help="File with one ZIP per line; omit with --refresh-stale.")
+    warm.add_argument("--tax-type", default="sales")
+    warm.add_argument("--license-key", required=True)
+    warm.add_argument("--trial", action="store_true", help="Use the trial endpoint.")
+    warm.add_argument("--concurrency", type=int, default=8)
+    warm.add_argument("--max-age-days", type=float, default=7)
+    warm.add_argument("--force", action="store_true", help="Look up ZIPs even when their entry is fresh.")
+    warm.add_argument("--refresh-stale", action="store_true", help="Also refresh every stale entry in the index.")
+    args = parser.parse_args(argv)
+
+    from get_best_match_rest import FastTaxClient
+
+    index = ZipRateIndex(args.index, max_age_seconds=args.max_age_days * 24 * 3600)
+    zips: List[str] = []
+    if args.zips:
+        with open(args.zips, encoding="utf-8") as zip_file:
+            zips.extend(line.strip() for line in zip_file if line.strip())
+    if args.refresh_stale:
+        zips.extend(index.stale_zips(args.tax_type))
+
+    with FastTaxClient(pool_maxsize=max(args.concurrency, 10)) as client:
+        stored = index.warm(client, zips, args.tax_type, args.license_key, not args.trial,
+                            args.concurrency, args.force)
+    print(f"Stored {stored} ZIP entries; index now holds {len(index)} entries.")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,22 @@
-from ft_response import GetBestMatchResponse, BestMatchTaxInfo, InformationComponent, Error
+from ft_response import GetBestMatchInput, GetBestMatchResponse
+from ft_decoder import decode_best_match, loads, parse_best_match_xml
+from ft_cache import ResultCache
+from ft_normalize import dedupe_inputs, input_key, make_key, normalize_input
+from ft_zip_index import ZipRateIndex
+from ft_single_flight import SingleFlight
+from ft_health import EndpointHealth, call_with_failover
+from ft_retry import Deadline, RetryPolicy, ServiceUnavailable, call_with_retry
+from ft_metrics import LookupMetrics, Metrics, instrument_adapter, timed_get
+from ft_rate_limit import AdaptiveConcurrency, RateLimiter, call_limited
+from ft_columnar import ColumnarResults
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from functools import partial
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import re
+import threading
+import time
 import requests
 
 # Endpoint URLs for ServiceObjects FastTax (FT) API
@@ -6,6 +24,503 @@ primary_url = "https://sws.serviceobjects.com/ft/web.svc/json/GetBestMatch?"
 backup_url = "https://swsbackup.serviceobjects.com/ft/web.svc/json/GetBestMatch?"
 trial_url = "https://trial.serviceobjects.com/ft/web.svc/json/GetBestMatch?"
 
+RESPONSE_FORMATS = ("json", "xml")
+
+
+def format_url(url: str, response_format: str) -> str:
+    """Point a GetBestMatch URL at the web.svc/json or web.svc/XML endpoint."""
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unsupported response format: {response_format}")
+    return re.sub(r"/(json|xml)/", "/XML/" if response_format == "xml" else "/json/", url, count=1, flags=re.I)
+
+
+def parse_xml_payload(body: Union[bytes, BinaryIO]) -> dict:
+    """Parse a web.svc/XML answer into the JSON payload shape (empty when it has no result)."""
+    data = parse_best_match_xml(body)
+    return data if data is not None else {}
+
+
+class FastTaxClient:
+    def __init__(
+        self,
+        pool_connections: int = 3,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        primary_url: str = primary_url,
+        backup_url: str = backup_url,
+        trial_url: str = trial_url,
+        cache: Optional[ResultCache] = None,
+        zip_index: Optional[ZipRateIndex] = None,
+        single_flight: Optional[SingleFlight] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge_delay: Optional[float] = None,
+        raw: bool = False,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 10.0,
+        timeout_seconds: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        metrics: Optional[Metrics] = None,
+        normalize: bool = False,
+        response_format: str = "json",
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrency] = None,
+    ):
+        """
+        Reusable FastTax (FT) REST client that owns a pooled, keep-alive requests.Session.
+
+        A single HTTPAdapter is mounted for every scheme, so the primary, backup and trial
+        hosts each get their own urllib3 connection pool inside the one PoolManager and
+        TCP/TLS connections are reused across calls. The adapter pools are thread-safe and
+        the session is not mutated after construction, so one instance can be shared by
+        any number of threads.
+
+        pool_connections: Number of per-host pools to keep (primary, backup and trial = 3).
+        pool_maxsize: Maximum number of kept-alive connections per host.
+        pool_block: Block callers when a host pool is exhausted instead of opening
+                    throw-away connections.
+        keep_alive: Send "Connection: keep-alive"; when False every call closes its connection.
+        primary_url, backup_url, trial_url: Endpoint overrides (defaults to the public FT URLs).
+        cache: Optional ResultCache consulted before every lookup; successful responses are stored in it.
+        zip_index: Optional ZipRateIndex that answers ZIP-only requests offline, records every ZIP-level
+                   match and answers for the ZIP when both endpoints fail.
+        single_flight: Optional SingleFlight that coalesces concurrent lookups of the same normalized
+                       input into one upstream call; its saved counter reports the calls avoided.
+        failure_threshold: Consecutive failures (network errors or Error.Number 4) that trip an
+                           endpoint's circuit breaker. While the primary is tripped, calls go straight
+                           to the backup; after reset_timeout seconds a probe call is let through.
+        reset_timeout: Seconds a tripped endpoint is skipped before it is probed again.
+        hedge_delay: When set, also fire the backup request if the primary has not answered after this
+                     many seconds and use whichever answers first.
+        raw: Return the parsed JSON payload as a plain dict instead of decoding it into
+             GetBestMatchResponse objects, for callers that only need a few fields such as TaxRate
+             (see ft_decoder.tax_rates). Raw lookups bypass the cache and the ZIP-level rate index.
+        connect_timeout: Seconds to wait for a connection to an endpoint.
+        read_timeout: Seconds to wait for an endpoint's response once connected.
+        timeout_seconds: Default overall deadline of a lookup, spanning primary, backup and retries
+                         (None for no deadline). Each attempt only gets the time that is left.
+        retry: Optional RetryPolicy for lookups where no endpoint could answer; backoff never
+               outlives the deadline.
+        metrics: Optional ft_metrics.Metrics that receives a LookupMetrics (phase timings, serving
+                 endpoint, retries, cache hits, error number) after every lookup. Without it no
+                 timers run at all.
+        normalize: Send canonical inputs (see ft_normalize.make_key()): upper-cased, unpunctuated
+                   addresses with USPS abbreviations, two-letter states and five-digit ZIP codes.
+        response_format: Wire format, "json" (web.svc/json) or "xml" (web.svc/XML). XML answers are
+                         parsed incrementally as they stream in and decode into the same models; the
+                         endpoint URLs are switched to the matching path.
+        rate_limiter: Optional ft_rate_limit.RateLimiter; every request (primary, backup, trial, hedge
+                      and retry) waits for a token, keeping the client within the license's QPS.
+        concurrency_limiter: Optional ft_rate_limit.AdaptiveConcurrency that caps the requests in flight
+                             and backs off when latency climbs or requests fail.
+        """
+        self.response_format = response_format
+        self.primary_url = format_url(primary_url, response_format)
+        self.backup_url = format_url(backup_url, response_format)
+        self.trial_url = format_url(trial_url, response_format)
+        self._parse = loads if response_format == "json" else parse_xml_payload
+        self.cache = cache
+        self.zip_index = zip_index
+        self.single_flight = single_flight
+        self.pool_maxsize = pool_maxsize
+        self.hedge_delay = hedge_delay
+        self.raw = raw
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.timeout_seconds = timeout_seconds
+        self.retry = retry
+        self.metrics = metrics
+        self.normalize = normalize
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.primary_health = EndpointHealth("primary", failure_threshold, reset_timeout)
+        self.backup_health = EndpointHealth("backup", failure_threshold, reset_timeout)
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        if metrics is not None:
+            instrument_adapter(adapter)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+    def close(self) -> None:
+        """Close the session, every pooled connection and the hedging threads."""
+        self.session.close()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
+    def __enter__(self) -> "FastTaxClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _fetch(
+        self,
+        url: str,
+        params: dict,
+        deadline: Deadline,
+        trace: Optional[LookupMetrics] = None,
+        endpoint: Optional[str] = None,
+    ) -> dict:
+        if self.rate_limiter is None and self.concurrency_limiter is None:
+            return self._request(url, params, deadline, trace, endpoint)
+        return call_limited(
+            partial(self._request, url, params, deadline, trace, endpoint),
+            self.rate_limiter, self.concurrency_limiter, deadline, _needs_failover
+        )
+
+    def _request(
+        self,
+        url: str,
+        params: dict,
+        deadline: Deadline,
+        trace: Optional[LookupMetrics] = None,
+        endpoint: Optional[str] = None,
+    ) -> dict:
+        with deadline.timeouts(requests.Timeout):
+            timeout = (deadline.clip(self.connect_timeout), deadline.clip(self.read_timeout))
+            if trace is None:
+                if self.response_format == "xml":
+                    # Parse while the body is still arriving instead of buffering it first
+                    with self.session.get(url, params=params, timeout=timeout, stream=True) as response:
+                        response.raise_for_status()
+                        response.raw.decode_content = True
+                        return parse_xml_payload(response.raw)
+                response = self.session.get(url, params=params, timeout=timeout)
+                response.raise_for_status()
+                return loads(response.content)
+
+            body, connect, ttfb, read = timed_get(self.session, url, params, timeout)
+            start = time.perf_counter()
+            data = self._parse(body)
+            parse = time.perf_counter() - start
+            error = data.get("Error")
+            if error is not None and (endpoint != "primary" or error.get("Number") != "4"):
+                trace.error_number = error.get("Number")
+            if not _needs_failover(data):
+                trace.served(endpoint, connect, ttfb, read, parse)
+            return data
+
+    def _decode(self, data: dict, trace: Optional[LookupMetrics] = None) -> Union[GetBestMatchResponse, dict]:
+        if self.raw:
+            return data
+        if trace is None:
+            return decode_best_match(data)
+        start = time.perf_counter()
+        response = decode_best_match(data)
+        trace.decode = time.perf_counter() - start
+        return response
+
+    def get_best_match(
+        self,
+        address: str,
+        address2: str,
+        city: str,
+        state: str,
+        zip: str,
+        tax_type: str,
+        license_key: str,
+        is_live: bool = True,
+        timeout_seconds: Optional[float] = None
+    ) -> GetBestMatchResponse:
+        """
+        Call the GetBestMatch endpoint over the pooled session, answering from the cache or the
+        ZIP-level rate index and coalescing concurrent duplicates when those are set.
+        See get_best_match() for parameters, return value and raised exceptions.
+        """
+        if self.normalize:
+            address, address2, city, state, zip, tax_type = make_key(address, address2, city, state, zip, tax_type)
+        args = (address, address2, city, state, zip, tax_type, license_key, is_live, timeout_seconds)
+        if self.metrics is None:
+            return self._get_best_match(*args)
+
+        trace = LookupMetrics("rest")
+        start = time.perf_counter()
+        try:
+            response = self._get_best_match(*args, trace)
+            trace.error_number = _error_number(response)
+            return response
+        except Exception as exc:
+            trace.exception = type(exc).__name__
+            raise
+        finally:
+            trace.total = time.perf_counter() - start
+            self.metrics.record(trace)
+
+    def _get_best_match(
+        self,
+        address: str,
+        address2: str,
+        city: str,
+        state: str,
+        zip: str,
+        tax_type: str,
+        license_key: str,
+        is_live: bool,
+        timeout_seconds: Optional[float],
+        trace: Optional[LookupMetrics] = None,
+    ) -> GetBestMatchResponse:
+        deadline = Deadline(timeout_seconds if timeout_seconds is not None else self.timeout_seconds)
+        # Only the cache and single-flight need the normalized key; plain lookups skip building it
+        key = None
+        if self.cache is not None or self.single_flight is not None:
+            key = ResultCache.make_key(address, address2, city, state, zip, tax_type, is_live)
+        if self.cache is not None and not self.raw:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if trace is not None:
+                    trace.source = "cache"
+                return cached
+
+        zip_only = bool(zip) and not (address or address2 or city)
+        if self.zip_index is not None and zip_only and not self.raw:
+            indexed = self.zip_index.get(zip, tax_type)
+            if indexed is not None:
+                if trace is not None:
+                    trace.source = "zip_index"
+                return indexed
+
+        params = {
+            "Address": address,
+            "Address2": address2,
+            "City": city,
+            "State": state,
+            "Zip": zip,
+            "TaxType": tax_type,
+            "LicenseKey": license_key,
+        }
+        try:
+            if self.single_flight is not None:
+                response = self.single_flight.do(
+                    key + (license_key,), lambda: self._lookup(params, is_live, deadline, trace), deadline
+                )
+                if trace is not None and trace.attempts == 0:
+                    trace.source = "coalesced"
+            else:
+                response = self._lookup(params, is_live, deadline, trace)
+        except RuntimeError:
+            # Both endpoints failed: a ZIP-level answer from the index beats no answer
+            if self.zip_index is None or not zip or self.raw:
+                raise
+            indexed = self.zip_index.get(zip, tax_type, allow_stale=self.zip_index.serve_stale_on_failure)
+            if indexed is None:
+                raise
+            if trace is not None:
+                trace.source = "zip_index"
+            return indexed
+
+        if not self.raw:
+            if self.zip_index is not None:
+                self.zip_index.record(zip, tax_type, response)
+            if self.cache is not None:
+                self.cache.put(key, response)
+        return response
+
+    def _lookup(
+        self, params: dict, is_live: bool, deadline: Deadline, trace: Optional[LookupMetrics] = None
+    ) -> GetBestMatchResponse:
+        return call_with_retry(partial(self._lookup_once, params, is_live, deadline, trace), self.retry, deadline)
+
+    def _lookup_once(
+        self, params: dict, is_live: bool, deadline: Deadline, trace: Optional[LookupMetrics] = None
+    ) -> GetBestMatchResponse:
+        if trace is not None:
+            trace.attempts += 1
+        if not is_live:
+            # Trial has no backup: any failure ends the attempt
+            try:
+                data = self._fetch(self.trial_url, params, deadline, trace, "trial")
+            except requests.RequestException as req_exc:
+                raise ServiceUnavailable(f"FastTax trial error: {str(req_exc)}") from req_exc
+            if _needs_failover(data):
+                raise ServiceUnavailable(f"FastTax trial error: {data['Error']}")
+            return self._decode(data, trace)
+
+        try:
+            # Primary first (skipped while its circuit is open), then backup
+            data = call_with_failover(
+                self.primary_health, partial(self._fetch_primary, params, deadline, trace),
+                self.backup_health, partial(self._fetch_backup, params, deadline, trace),
+                self.hedge_delay, self._get_hedge_executor() if self.hedge_delay is not None else None,
+            )
+        except requests.RequestException as req_exc:
+            raise ServiceUnavailable("FastTax service unreachable on both endpoints") from req_exc
+        return self._decode(data, trace)
+
+    def _fetch_primary(self, params: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> dict:
+        data = self._fetch(self.primary_url, params, deadline, trace, "primary")
+        # If API returned Error.Number 4 in JSON payload, trigger fallback
+        if _needs_failover(data):
+            raise RuntimeError(f"FastTax primary error: {data['Error']}")
+        return data
+
+    def _fetch_backup(self, params: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> dict:
+        data = self._fetch(self.backup_url, params, deadline, trace, "backup")
+        # If still error, propagate exception
+        if _needs_failover(data):
+            raise ServiceUnavailable(f"FastTax service error: {data['Error']}")
+        if "Error" in data:
+            raise RuntimeError(f"FastTax service error: {data['Error']}")
+        return data
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=2 * self.pool_maxsize, thread_name_prefix="fast-tax-hedge"
+                    )
+        return self._hedge_executor
+
+    def iter_best_match_batch(
+        self,
+        inputs: Iterable[GetBestMatchInput],
+        concurrency: int = 8,
+        dedupe: bool = False
+    ) -> Iterator[Union[GetBestMatchResponse, Exception]]:
+        """
+        Lazily run GetBestMatch for every input over a bounded thread pool that shares this
+        client's connection pool, yielding results in input order.
+
+        Inputs are consumed as results are yielded, so at most 2 * concurrency lookups are
+        queued at any time regardless of how many inputs there are. For best reuse keep
+        concurrency at or below the client's pool_maxsize.
+
+        Parameters:
+            inputs: GetBestMatchInput items; each one carries its own LicenseKey and IsLive.
+            concurrency: Number of lookups in flight at once.
+            dedupe: Send normalized inputs (see ft_normalize) and share one lookup between
+                    equivalent inputs that are queued at the same time. Duplicates further apart
+                    are answered by the client's cache when it has one; get_best_match_batch()
+                    dedupes the whole batch.
+
+        Yields:
+            GetBestMatchResponse for each successful lookup, or the exception raised for that
+            input. A failing item never aborts the rest of the batch.
+        """
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fast-tax") as pool:
+            pending = deque()
+            # Queued lookups by input key, with the number of pending entries sharing each one
+            queued: Dict[Tuple, list] = {}
+            for item in inputs:
+                if not dedupe:
+                    pending.append((None, pool.submit(self._get_best_match_input, item)))
+                else:
+                    key = input_key(item)
+                    entry = queued.get(key)
+                    if entry is None:
+                        entry = queued[key] = [pool.submit(self._get_best_match_input, normalize_input(item)), 0]
+                    entry[1] += 1
+                    pending.append((key, entry[0]))
+                if len(pending) >= 2 * concurrency:
+                    yield self._next_result(pending, queued)
+            while pending:
+                yield self._next_result(pending, queued)
+
+    @staticmethod
+    def _next_result(pending: deque, queued: Dict[Tuple, list]) -> Union[GetBestMatchResponse, Exception]:
+        key, future = pending.popleft()
+        if key is not None:
+            entry = queued[key]
+            entry[1] -= 1
+            if not entry[1]:
+                del queued[key]
+        return _result_or_exception(future)
+
+    def get_best_match_batch(
+        self,
+        inputs: Iterable[GetBestMatchInput],
+        concurrency: int = 8,
+        dedupe: bool = False
+    ) -> List[Union[GetBestMatchResponse, Exception]]:
+        """
+        Run GetBestMatch for every input concurrently and return the results in input order.
+        With dedupe=True, inputs that normalize to the same lookup (see ft_normalize.dedupe_inputs())
+        make one call whose result is shared by every one of them. See iter_best_match_batch() for
+        details.
+        """
+        if not dedupe:
+            return list(self.iter_best_match_batch(inputs, concurrency))
+        unique, index = dedupe_inputs(inputs)
+        results = list(self.iter_best_match_batch(unique, concurrency))
+        return [results[position] for position in index]
+
+    def get_best_match_columnar(
+        self,
+        inputs: Iterable[GetBestMatchInput],
+        concurrency: int = 8,
+        columns: Optional[ColumnarResults] = None,
+        dedupe: bool = False
+    ) -> ColumnarResults:
+        """
+        Run GetBestMatch for every input concurrently and append each result, in input order, to a
+        ColumnarResults as it arrives, so no per-row response objects outlive the lookup. With a
+        raw=True client the payloads go into the columns without being decoded into dataclasses.
+
+        Parameters:
+            inputs: GetBestMatchInput items; each one carries its own LicenseKey and IsLive.
+            concurrency: Number of lookups in flight at once.
+            columns: Container to append to (e.g., across several calls); a new one by default. It must
+                     not have been exported yet (see ColumnarResults).
+            dedupe: Share lookups between equivalent queued inputs (see iter_best_match_batch()).
+
+        Returns:
+            ColumnarResults: Items, InformationComponents and errors tables, ready for to_numpy(),
+            items_table() or write_parquet().
+        """
+        columns = ColumnarResults() if columns is None else columns
+        columns.extend(self.iter_best_match_batch(inputs, concurrency, dedupe))
+        return columns
+
+    def _get_best_match_input(self, item: GetBestMatchInput) -> GetBestMatchResponse:
+        return self.get_best_match(
+            item.Address, item.Address2, item.City, item.State, item.Zip,
+            item.TaxType, item.LicenseKey, item.IsLive, item.TimeoutSeconds
+        )
+
+
+def _needs_failover(data: dict) -> bool:
+    error = data.get("Error")
+    return error is not None and error.get("Number") == "4"
+
+
+def _error_number(response: Union[GetBestMatchResponse, dict]) -> Optional[str]:
+    error = response.get("Error") if isinstance(response, dict) else response.Error
+    if not error:
+        return None
+    return error.get("Number") if isinstance(error, dict) else error.Number
+
+
+def _result_or_exception(future: Future) -> Union[GetBestMatchResponse, Exception]:
+    try:
+        return future.result()
+    except Exception as exc:
+        return exc
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> FastTaxClient:
+    """Return the process-wide FastTaxClient used by get_best_match(), creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = FastTaxClient()
+    return _default_client
+
+
 def get_best_match(
     address: str,
     address2: str,
@@ -14,11 +529,13 @@ def get_best_match(
     zip: str,
     tax_type: str,
     license_key: str,
-    is_live: bool = True
+    is_live: bool = True,
+    timeout_seconds: Optional[float] = None
 ) -> GetBestMatchResponse:
     """
     Call ServiceObjects FastTax (FT) API's GetBestMatch endpoint
     to retrieve tax rate information (e.g., total tax rate, city, county, state rates) for a given US address.
+    Requests are sent through the shared, connection-pooled client returned by get_default_client().
 
     Parameters:
         address: Address line of the address to get tax rates for (e.g., "123 Main Street").
@@ -29,124 +546,36 @@ def get_best_match(
         tax_type: The type of tax to look for ("sales" or "use").
         license_key: Your ServiceObjects license key.
         is_live: Use live or trial servers.
+        timeout_seconds: Overall deadline for the lookup across primary, backup and retries. Optional.
 
     Returns:
         GetBestMatchResponse: Parsed JSON response with tax rate results or error details.
 
     Raises:
         RuntimeError: If the API returns an error payload.
-        requests.RequestException: On network/HTTP failures (trial mode).
+        ServiceUnavailable: A RuntimeError raised when no endpoint could be reached.
+        DeadlineExceeded: A RuntimeError raised when timeout_seconds runs out.
     """
-    params = {
-        "Address": address,
-        "Address2": address2,
-        "City": city,
-        "State": state,
-        "Zip": zip,
-        "TaxType": tax_type,
-        "LicenseKey": license_key,
-    }
-    # Select the base URL: production vs trial
-    url = primary_url if is_live else trial_url
+    return get_default_client().get_best_match(
+        address, address2, city, state, zip, tax_type, license_key, is_live, timeout_seconds
+    )
 
-    try:
-        # Attempt primary (or trial) endpoint
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        # If API returned an error in JSON payload, trigger fallback
-        error = data.get('Error')
-        if not (error is None or error.get('Number') != "4"):
-            if is_live:
-                # Try backup URL
-                response = requests.get(backup_url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
 
-                # If still error, propagate exception
-                if 'Error' in data:
-                    raise RuntimeError(f"FastTax service error: {data['Error']}")
-            else:
-                # Trial mode error is terminal
-                raise RuntimeError(f"FastTax trial error: {data['Error']}")
-
-        # Convert JSON response to GetBestMatchResponse for structured access
-        error = Error(**data.get("Error", {})) if data.get("Error") else None
-
-        return GetBestMatchResponse(
-            TaxInfoItems=[
-                BestMatchTaxInfo(
-                    Zip=ti.get("Zip"),
-                    City=ti.get("City"),
-                    County=ti.get("County"),
-                    StateAbbreviation=ti.get("StateAbbreviation"),
-                    StateName=ti.get("StateName"),
-                    TaxRate=ti.get("TaxRate"),
-                    StateRate=ti.get("StateRate"),
-                    CityRate=ti.get("CityRate"),
-                    CountyRate=ti.get("CountyRate"),
-                    CountyDistrictRate=ti.get("CountyDistrictRate"),
-                    CityDistrictRate=ti.get("CityDistrictRate"),
-                    SpecialDistrictRate=ti.get("SpecialDistrictRate"),
-                    InformationComponents=[
-                        InformationComponent(Name=comp.get("Name"), Value=comp.get("Value"))
-                        for comp in ti.get("InformationComponents", [])
-                    ] if "InformationComponents" in ti else [],
-                    TotalTaxExempt=ti.get("TotalTaxExempt"),
-                    NotesCodes=ti.get("NotesCodes"),
-                    NotesDesc=ti.get("NotesDesc")
-                )
-                for ti in data.get("TaxInfoItems", [])
-            ] if "TaxInfoItems" in data else [],
-            MatchLevel=data.get("MatchLevel"),
-            Error=error,
-            Debug=data.get("Debug", [])
-        )
+def get_best_match_batch(
+    inputs: Iterable[GetBestMatchInput],
+    concurrency: int = 8,
+    dedupe: bool = False
+) -> List[Union[GetBestMatchResponse, Exception]]:
+    """
+    Call GetBestMatch for many inputs in parallel through the shared, connection-pooled client.
 
-    except requests.RequestException as req_exc:
-        # Network or HTTP-level error occurred
-        if is_live:
-            try:
-                # Fallback to backup URL
-                response = requests.get(backup_url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                if "Error" in data:
-                    raise RuntimeError(f"FastTax backup error: {data['Error']}") from req_exc
-
-                error = Error(**data.get("Error", {})) if data.get("Error") else None
-
-                return GetBestMatchResponse(
-                    TaxInfoItems=[
-                        BestMatchTaxInfo(
-                            Zip=ti.get("Zip"),
-                            City=ti.get("City"),
-                            County=ti.get("County"),
-                            StateAbbreviation=ti.get("StateAbbreviation"),
-                            StateName=ti.get("StateName"),
-                            TaxRate=ti.get("TaxRate"),
-                            StateRate=ti.get("StateRate"),
-                            CityRate=ti.get("CityRate"),
-                            CountyRate=ti.get("CountyRate"),
-                            CountyDistrictRate=ti.get("CountyDistrictRate"),
-                            CityDistrictRate=ti.get("CityDistrictRate"),
-                            SpecialDistrictRate=ti.get("SpecialDistrictRate"),
-                            InformationComponents=[
-                                InformationComponent(Name=comp.get("Name"), Value=comp.get("Value"))
-                                for comp in ti.get("InformationComponents", [])
-                            ] if "InformationComponents" in ti else [],
-                            TotalTaxExempt=ti.get("TotalTaxExempt"),
-                            NotesCodes=ti.get("NotesCodes"),
-                            NotesDesc=ti.get("NotesDesc")
-                        )
-                        for ti in data.get("TaxInfoItems", [])
-                    ] if "TaxInfoItems" in data else [],
-                    MatchLevel=data.get("MatchLevel"),
-                    Error=error,
-                    Debug=data.get("Debug", [])
-                )
-            except Exception as backup_exc:
-                raise RuntimeError("FastTax service unreachable on both endpoints") from backup_exc
-        else:
-            raise RuntimeError(f"FastTax trial error: {str(req_exc)}") from req_exc
\ No newline at end of file
+    Parameters:
+        inputs: GetBestMatchInput items; each one carries its own LicenseKey and IsLive.
+        concurrency: Number of lookups in flight at once.
+        dedupe: Make one call per distinct normalized input and share its result (see ft_normalize).
+
+    Returns:
+        list: One entry per input, in input order: the GetBestMatchResponse, or the exception
+        raised for that input (a failing item does not abort the batch).
+    """
+    return get_default_client().get_best_match_batch(inputs, concurrency, dedupe)
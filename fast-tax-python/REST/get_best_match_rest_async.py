@@ -0,0 +1,354 @@
+from ft_response import GetBestMatchInput, GetBestMatchResponse
+from ft_cache import ResultCache
+from ft_normalize import dedupe_inputs, make_key
+from ft_decoder import BestMatchXmlParser, decode_best_match, loads
+from ft_single_flight import AsyncSingleFlight
+from ft_health import EndpointHealth, call_with_failover_async
+from ft_retry import Deadline, RetryPolicy, ServiceUnavailable, call_with_retry_async
+from ft_metrics import LookupMetrics, Metrics, aiohttp_trace_config
+from ft_rate_limit import AdaptiveConcurrency, RateLimiter, call_limited_async
+from get_best_match_rest import (primary_url, backup_url, trial_url, format_url, parse_xml_payload, _error_number,
+                                 _needs_failover)
+from functools import partial
+from types import SimpleNamespace
+from typing import Iterable, List, Optional, Union
+import asyncio
+import time
+import aiohttp
+
+# Failures that trigger the backup endpoint, the asyncio counterpart of requests.RequestException
+_network_errors = (aiohttp.ClientError, asyncio.TimeoutError)
+_XML_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncFastTaxClient:
+    def __init__(
+        self,
+        max_in_flight: int = 100,
+        pool_maxsize: int = 100,
+        keepalive_timeout: float = 30.0,
+        primary_url: str = primary_url,
+        backup_url: str = backup_url,
+        trial_url: str = trial_url,
+        cache: Optional[ResultCache] = None,
+        single_flight: Optional[AsyncSingleFlight] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 10.0,
+        timeout_seconds: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        metrics: Optional[Metrics] = None,
+        normalize: bool = False,
+        response_format: str = "json",
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrency] = None,
+    ):
+        """
+        asyncio-native FastTax (FT) REST client built on a pooled aiohttp.ClientSession.
+
+        Failover follows FastTaxClient exactly (primary -> backup on Error.Number == "4" or a
+        network failure, straight to backup while the primary's circuit breaker is open, trial
+        errors are terminal) and results are the same GetBestMatchResponse dataclasses. The session is created on first use inside the
+        running event loop; use the client as an async context manager or call close().
+
+        max_in_flight: Maximum number of lookups awaiting the service at once (semaphore bound).
+        pool_maxsize: Maximum number of open connections across all hosts.
+        keepalive_timeout: Seconds an idle connection is kept open for reuse.
+        primary_url, backup_url, trial_url: Endpoint overrides (defaults to the public FT URLs).
+        cache: Optional ResultCache consulted before every lookup; successful responses are stored in it.
+        single_flight: Optional AsyncSingleFlight that coalesces concurrent lookups of the same normalized
+                       input into one upstream call; its saved counter reports the calls avoided.
+        failure_threshold, reset_timeout: Circuit breaker settings, see FastTaxClient.
+        connect_timeout, read_timeout, timeout_seconds, retry: Per-call timeouts, default deadline and
+                                                               retry policy, see FastTaxClient.
+        metrics: Optional ft_metrics.Metrics that receives a LookupMetrics after every lookup, see FastTaxClient.
+        normalize: Send canonical inputs, see FastTaxClient.
+        response_format: "json" or "xml" wire format, see FastTaxClient; XML is parsed chunk by chunk as it arrives.
+        rate_limiter, concurrency_limiter: Optional ft_rate_limit.RateLimiter and AdaptiveConcurrency,
+                                           see FastTaxClient; waits never block the event loop.
+        """
+        self.response_format = response_format
+        self.primary_url = format_url(primary_url, response_format)
+        self.backup_url = format_url(backup_url, response_format)
+        self.trial_url = format_url(trial_url, response_format)
+        self._parse = loads if response_format == "json" else parse_xml_payload
+        self.cache = cache
+        self.single_flight = single_flight
+        self.primary_health = EndpointHealth("primary", failure_threshold, reset_timeout)
+        self.backup_health = EndpointHealth("backup", failure_threshold, reset_timeout)
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.timeout_seconds = timeout_seconds
+        self.retry = retry
+        self.metrics = metrics
+        self.normalize = normalize
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_maxsize,
+                    keepalive_timeout=self.keepalive_timeout,
+                ),
+                trace_configs=[aiohttp_trace_config()] if self.metrics is not None else None,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and every pooled connection."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncFastTaxClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _fetch(
+        self,
+        url: str,
+        params: dict,
+        deadline: Deadline,
+        trace: Optional[LookupMetrics] = None,
+        endpoint: Optional[str] = None,
+    ) -> dict:
+        if self.rate_limiter is None and self.concurrency_limiter is None:
+            return await self._request(url, params, deadline, trace, endpoint)
+        return await call_limited_async(
+            partial(self._request, url, params, deadline, trace, endpoint),
+            self.rate_limiter, self.concurrency_limiter, deadline, _needs_failover
+        )
+
+    async def _request(
+        self,
+        url: str,
+        params: dict,
+        deadline: Deadline,
+        trace: Optional[LookupMetrics] = None,
+        endpoint: Optional[str] = None,
+    ) -> dict:
+        with deadline.timeouts(asyncio.TimeoutError):
+            timeout = aiohttp.ClientTimeout(
+                total=deadline.remaining(),
+                connect=deadline.clip(self.connect_timeout),
+                sock_read=deadline.clip(self.read_timeout),
+            )
+            if trace is None:
+                async with self._get_session().get(url, params=params, timeout=timeout) as response:
+                    response.raise_for_status()
+                    if self.response_format == "xml":
+                        parser = BestMatchXmlParser()
+                        async for chunk in response.content.iter_chunked(_XML_CHUNK_SIZE):
+                            parser.feed(chunk)
+                        data = parser.close()
+                        return data if data is not None else {}
+                    return loads(await response.read())
+
+            timing = SimpleNamespace(connect=0.0)
+            start = time.perf_counter()
+            request = self._get_session().get(url, params=params, timeout=timeout, trace_request_ctx=timing)
+            async with request as response:
+                headers_at = time.perf_counter()
+                response.raise_for_status()
+                body = await response.read()
+            read_at = time.perf_counter()
+            data = self._parse(body)
+            parse = time.perf_counter() - read_at
+            error = data.get("Error")
+            if error is not None and (endpoint != "primary" or error.get("Number") != "4"):
+                trace.error_number = error.get("Number")
+            if not _needs_failover(data):
+                trace.served(endpoint, timing.connect, headers_at - start - timing.connect, read_at - headers_at, parse)
+            return data
+
+    def _decode(self, data: dict, trace: Optional[LookupMetrics]) -> GetBestMatchResponse:
+        if trace is None:
+            return decode_best_match(data)
+        start = time.perf_counter()
+        response = decode_best_match(data)
+        trace.decode = time.perf_counter() - start
+        return response
+
+    async def get_best_match(
+        self,
+        address: str,
+        address2: str,
+        city: str,
+        state: str,
+        zip: str,
+        tax_type: str,
+        license_key: str,
+        is_live: bool = True,
+        timeout_seconds: Optional[float] = None
+    ) -> GetBestMatchResponse:
+        """
+        Call ServiceObjects FastTax (FT) API's GetBestMatch endpoint without blocking the event loop.
+
+        Parameters:
+            address: Address line of the address to get tax rates for (e.g., "123 Main Street").
+            address2: Secondary address line (e.g., "Apt 4B"). Optional.
+            city: The city of the address (e.g., "New York"). Optional if zip is provided.
+            state: The state of the address (e.g., "NY"). Optional if zip is provided.
+            zip: The ZIP code of the address. Optional if city and state are provided.
+            tax_type: The type of tax to look for ("sales" or "use").
+            license_key: Your ServiceObjects license key.
+            is_live: Use live or trial servers.
+            timeout_seconds: Overall deadline for the lookup across primary, backup and retries. Optional.
+
+        Returns:
+            GetBestMatchResponse: Parsed JSON response with tax rate results or error details.
+
+        Raises:
+            RuntimeError: If the API returns an error payload.
+            ServiceUnavailable: A RuntimeError raised when no endpoint could be reached.
+            DeadlineExceeded: A RuntimeError raised when timeout_seconds runs out.
+        """
+        if self.normalize:
+            address, address2, city, state, zip, tax_type = make_key(address, address2, city, state, zip, tax_type)
+        args = (address, address2, city, state, zip, tax_type, license_key, is_live, timeout_seconds)
+        if self.metrics is None:
+            return await self._get_best_match(*args)
+
+        trace = LookupMetrics("rest-async")
+        start = time.perf_counter()
+        try:
+            response = await self._get_best_match(*args, trace)
+            trace.error_number = _error_number(response)
+            return response
+        except Exception as exc:
+            trace.exception = type(exc).__name__
+            raise
+        finally:
+            trace.total = time.perf_counter() - start
+            self.metrics.record(trace)
+
+    async def _get_best_match(
+        self,
+        address: str,
+        address2: str,
+        city: str,
+        state: str,
+        zip: str,
+        tax_type: str,
+        license_key: str,
+        is_live: bool,
+        timeout_seconds: Optional[float],
+        trace: Optional[LookupMetrics] = None,
+    ) -> GetBestMatchResponse:
+        deadline = Deadline(timeout_seconds if timeout_seconds is not None else self.timeout_seconds)
+        # Only the cache and single-flight need the normalized key; plain lookups skip building it
+        key = None
+        if self.cache is not None or self.single_flight is not None:
+            key = ResultCache.make_key(address, address2, city, state, zip, tax_type, is_live)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if trace is not None:
+                    trace.source = "cache"
+                return cached
+
+        params = {
+            "Address": address,
+            "Address2": address2,
+            "City": city,
+            "State": state,
+            "Zip": zip,
+            "TaxType": tax_type,
+            "LicenseKey": license_key,
+        }
+        # aiohttp rejects None query values; requests silently drops them
+        params = {name: value for name, value in params.items() if value is not None}
+        if self.single_flight is not None:
+            response = await self.single_flight.do(
+                key + (license_key,), lambda: self._lookup(params, is_live, deadline, trace), deadline
+            )
+            if trace is not None and trace.attempts == 0:
+                trace.source = "coalesced"
+        else:
+            response = await self._lookup(params, is_live, deadline, trace)
+        if self.cache is not None:
+            self.cache.put(key, response)
+        return response
+
+    async def _lookup(
+        self, params: dict, is_live: bool, deadline: Deadline, trace: Optional[LookupMetrics] = None
+    ) -> GetBestMatchResponse:
+        # Retry backoff happens outside the semaphore so a waiting retry does not hold a slot
+        return await call_with_retry_async(
+            partial(self._lookup_once, params, is_live, deadline, trace), self.retry, deadline
+        )
+
+    async def _lookup_once(
+        self, params: dict, is_live: bool, deadline: Deadline, trace: Optional[LookupMetrics] = None
+    ) -> GetBestMatchResponse:
+        async with self._semaphore:
+            if trace is not None:
+                trace.attempts += 1
+            if not is_live:
+                try:
+                    data = await self._fetch(self.trial_url, params, deadline, trace, "trial")
+                except _network_errors as req_exc:
+                    raise ServiceUnavailable(f"FastTax trial error: {str(req_exc)}") from req_exc
+                if _needs_failover(data):
+                    raise ServiceUnavailable(f"FastTax trial error: {data['Error']}")
+                return self._decode(data, trace)
+
+            try:
+                data = await call_with_failover_async(
+                    self.primary_health, partial(self._fetch_primary, params, deadline, trace),
+                    self.backup_health, partial(self._fetch_backup, params, deadline, trace),
+                )
+            except _network_errors as req_exc:
+                raise ServiceUnavailable("FastTax service unreachable on both endpoints") from req_exc
+            return self._decode(data, trace)
+
+    async def _fetch_primary(self, params: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> dict:
+        data = await self._fetch(self.primary_url, params, deadline, trace, "primary")
+        if _needs_failover(data):
+            raise RuntimeError(f"FastTax primary error: {data['Error']}")
+        return data
+
+    async def _fetch_backup(self, params: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> dict:
+        data = await self._fetch(self.backup_url, params, deadline, trace, "backup")
+        if _needs_failover(data):
+            raise ServiceUnavailable(f"FastTax service error: {data['Error']}")
+        if "Error" in data:
+            raise RuntimeError(f"FastTax service error: {data['Error']}")
+        return data
+
+    async def get_best_match_batch(
+        self,
+        inputs: Iterable[GetBestMatchInput],
+        dedupe: bool = False
+    ) -> List[Union[GetBestMatchResponse, Exception]]:
+        """
+        Run GetBestMatch for every input concurrently (bounded by max_in_flight) and return the
+        results in input order. A failing input yields its exception in place of a response.
+        With dedupe=True, inputs that normalize to the same lookup make one call and share its
+        result (see ft_normalize.dedupe_inputs()).
+        """
+        index = None
+        if dedupe:
+            inputs, index = dedupe_inputs(inputs)
+        results = await asyncio.gather(
+            *(
+                self.get_best_match(
+                    item.Address, item.Address2, item.City, item.State, item.Zip,
+                    item.TaxType, item.LicenseKey, item.IsLive, item.TimeoutSeconds
+                )
+                for item in inputs
+            ),
+            return_exceptions=True,
+        )
+        if index is None:
+            return results
+        return [results[position] for position in index]
@@ -1,32 +1,252 @@
-from suds.client import Client
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Tuple, Union
+from urllib.error import URLError
+from xml.etree.ElementTree import ParseError
+from xml.sax.saxutils import escape
+import re
+import socket
+import threading
+import time
+import os
+import sys
+
+from suds.client import Client, ServiceSelector
+from suds.cache import ObjectCache
+from suds.transport.https import HttpAuthenticated
 from suds import WebFault
 from suds.sudsobject import Object
+from suds.plugin import MessagePlugin
+from requests.adapters import HTTPAdapter
+import requests
+
+# Shared FastTax helpers (result caching, request coalescing, endpoint health) live next to the REST client
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "REST"))
+
+from ft_cache import ResultCache
+from ft_single_flight import SingleFlight
+from ft_health import EndpointHealth, call_with_failover
+from ft_retry import Deadline, DeadlineExceeded, RetryPolicy, ServiceUnavailable, call_with_retry
+from ft_metrics import LookupMetrics, Metrics, instrument_adapter, timed_post
+from ft_rate_limit import AdaptiveConcurrency, RateLimiter, call_limited
+from ft_response import GetBestMatchResponse
+from ft_decoder import decode_best_match, parse_best_match_xml
+
+# Parsed WSDL clients shared process-wide, keyed by (wsdl url, cache location, cache days).
+# Each GetBestMatchSoap instance works on per-thread clones of these, which share the parsed
+# WSDL/schema but carry their own options and message state.
+_prototype_clients = {}
+_prototype_lock = threading.Lock()
+
+
+def _get_prototype_client(wsdl: str, cache_dir: Optional[str], cache_days: int, timeout: float) -> Client:
+    key = (wsdl, cache_dir, cache_days)
+    client = _prototype_clients.get(key)
+    if client is None:
+        with _prototype_lock:
+            client = _prototype_clients.get(key)
+            if client is None:
+                client = Client(
+                    wsdl,
+                    cache=ObjectCache(location=cache_dir, days=cache_days),
+                    timeout=timeout,
+                )
+                _prototype_clients[key] = client
+    return client
+
+
+def _clone_client(prototype: Client, timeout: float) -> Client:
+    """
+    Same as Client.clone(): the clone shares the prototype's parsed WSDL, factory and service
+    definitions but owns its options, transport and message state. Options are rebuilt rather than
+    deep-copied because Client.clone() recurses without end on the transport options on Python 3.
+    """
+    client = Client.__new__(Client)
+    client.options = type(prototype.options)()
+    client.options.transport = HttpAuthenticated()
+    client.set_options(cache=prototype.options.cache, timeout=timeout)
+    client.wsdl = prototype.wsdl
+    client.factory = prototype.factory
+    client.service = ServiceSelector(client, prototype.wsdl.services)
+    client.sd = prototype.sd
+    client.messages = dict(tx=None, rx=None)
+    return client
+
+
+class _MessageTimer(MessagePlugin):
+    """Stamps when this thread's last SOAP request went out and when its reply came back (before parsing)."""
+
+    def __init__(self):
+        self.times = threading.local()
+
+    def sending(self, context) -> None:
+        self.times.sent = time.perf_counter()
+
+    def received(self, context) -> None:
+        self.times.received = time.perf_counter()
+
+
+_message_timer = _MessageTimer()
+
+# Fast mode: the GetBestMatch request, pre-rendered once with a slot for each (escaped) argument
+SOAP_ACTION = "http://www.serviceobjects.com/ISOAP/GetBestMatch"
+_SOAP_HEADERS = {"Content-Type": "text/xml; charset=utf-8", "SOAPAction": f'"{SOAP_ACTION}"'}
+_ENVELOPE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+    '<GetBestMatch xmlns="http://www.serviceobjects.com">'
+    + "".join(f"<{name}>{{{name}}}</{name}>"
+              for name in ("Address", "Address2", "City", "State", "Zip", "TaxType", "LicenseKey"))
+    + "</GetBestMatch></soap:Body></soap:Envelope>"
+)
+
+
+def soap_endpoint(wsdl: str) -> str:
+    """SOAP endpoint for a FastTax WSDL URL: ".../ft/soap.svc?wsdl" -> ".../ft/soap.svc/SOAP"."""
+    return re.sub(r"\?wsdl$", "/SOAP", wsdl, flags=re.IGNORECASE)
+
+
+def _raise_for_status(response: requests.Response) -> None:
+    """raise_for_status(), except that a SOAP fault (HTTP 500 with an XML body) raises its faultstring."""
+    if response.status_code == 500 and "xml" in response.headers.get("Content-Type", ""):
+        try:
+            parse_best_match_xml(response.content)  # ValueError("SOAP fault: ...")
+        except ParseError:
+            pass  # Not an envelope; report the HTTP error
+    response.raise_for_status()
+
+
+def _needs_failover(sent: Tuple[Union[Object, GetBestMatchResponse, None], Optional[tuple]]) -> bool:
+    """Whether a _send() result is no result or Error.Number 4, the replies that trigger the backup."""
+    response = sent[0]
+    return response is None or bool(getattr(response, "Error", None) and response.Error.Number == "4")
 
 
 class GetBestMatchSoap:
-    def __init__(self, license_key: str, is_live: bool = True, timeout_ms: int = 15000):
+    def __init__(
+        self,
+        license_key: str,
+        is_live: bool = True,
+        timeout_ms: int = 15000,
+        lazy_init: bool = True,
+        wsdl_cache_dir: Optional[str] = None,
+        wsdl_cache_days: int = 1,
+        cache: Optional[ResultCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge_delay: Optional[float] = None,
+        deadline_ms: Optional[int] = None,
+        retry: Optional[RetryPolicy] = None,
+        primary_wsdl: Optional[str] = None,
+        backup_wsdl: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        fast: bool = False,
+        primary_endpoint: Optional[str] = None,
+        backup_endpoint: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrency] = None,
+    ):
         """
         license_key: Service Objects FT license key.
         is_live: Whether to use live or trial endpoints
-        timeout_ms: SOAP call timeout in milliseconds
+        timeout_ms: SOAP call timeout in milliseconds, applied to the WSDL download and every call
+        lazy_init: When False, the primary WSDL is fetched and parsed here instead of on the first call
+                   (the backup client is always built on first failover)
+        wsdl_cache_dir: Directory for the on-disk WSDL/schema cache (defaults to a temporary folder)
+        wsdl_cache_days: How long cached WSDL/schema documents stay valid
+        cache: Optional ResultCache consulted before every call; responses without an Error are stored in it
+        single_flight: Optional SingleFlight that coalesces concurrent calls for the same normalized input
+                       into one upstream call; its saved counter reports the calls avoided
+        failure_threshold: Consecutive failures (faults, no result or Error.Number 4) that trip an endpoint's
+                           circuit breaker; while the primary is tripped, calls go straight to the backup
+        reset_timeout: Seconds a tripped endpoint is skipped before a probe call is let through
+        hedge_delay: When set, also call the backup if the primary has not answered after this many seconds
+                     and use whichever answers first
+        deadline_ms: Default overall deadline of a call in milliseconds, spanning primary, backup and retries
+                     (None for no deadline); each SOAP call's timeout_ms is clipped to the time that is left
+        retry: Optional RetryPolicy for calls where neither endpoint answered; backoff never outlives the deadline
+        primary_wsdl, backup_wsdl: WSDL URL overrides (default to the public live or trial endpoints)
+        metrics: Optional ft_metrics.Metrics that receives a LookupMetrics after every call; suds only exposes
+                 the round trip (ttfb) and the reply parsing (parse), so connect, read and decode stay 0
+                 (fast mode reports every phase)
+        fast: Skip suds: post a pre-rendered envelope over a pooled requests.Session, parse the reply with a
+              streaming XML parser and return the GetBestMatchResponse dataclasses of the REST client.
+              No WSDL is downloaded; calls go to primary_endpoint and backup_endpoint
+        primary_endpoint, backup_endpoint: SOAP endpoint URLs used by fast mode (default to the WSDL URLs with
+                                           "?wsdl" replaced by "/SOAP", the address the service's WSDL publishes)
+        rate_limiter: Optional ft_rate_limit.RateLimiter; every SOAP call (primary, backup, hedge and retry)
+                      waits for a token, keeping the client within the license's QPS
+        concurrency_limiter: Optional ft_rate_limit.AdaptiveConcurrency that caps the calls in flight and
+                             backs off when latency climbs or calls fail
         """
         self.is_live = is_live
         self.timeout = timeout_ms / 1000.0
         self.license_key = license_key
-       
+        self.wsdl_cache_dir = wsdl_cache_dir
+        self.wsdl_cache_days = wsdl_cache_days
+        self.cache = cache
+        self.single_flight = single_flight
+        self.hedge_delay = hedge_delay
+        self.deadline_ms = deadline_ms
+        self.retry = retry
+        self.metrics = metrics
+        self.fast = fast
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.primary_health = EndpointHealth("primary", failure_threshold, reset_timeout)
+        self.backup_health = EndpointHealth("backup", failure_threshold, reset_timeout)
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self._local = threading.local()
 
         # WSDL URLs
-        self._primary_wsdl = (
+        self._primary_wsdl = primary_wsdl or (
             "https://sws.serviceobjects.com/ft/soap.svc?wsdl"
             if is_live
             else "https://trial.serviceobjects.com/ft/soap.svc?wsdl"
         )
-        self._backup_wsdl = (
+        self._backup_wsdl = backup_wsdl or (
             "https://swsbackup.serviceobjects.com/ft/soap.svc?wsdl"
             if is_live
             else "https://trial.serviceobjects.com/ft/soap.svc?wsdl"
         )
 
+        self._primary_endpoint = primary_endpoint or soap_endpoint(self._primary_wsdl)
+        self._backup_endpoint = backup_endpoint or soap_endpoint(self._backup_wsdl)
+
+        self.session: Optional[requests.Session] = None
+        if fast:
+            self.session = requests.Session()
+            adapter = HTTPAdapter()
+            if metrics is not None:
+                instrument_adapter(adapter)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        elif not lazy_init:
+            self._client(self._primary_wsdl)
+
+    def close(self) -> None:
+        """Close the fast mode session and the hedging threads."""
+        if self.session is not None:
+            self.session.close()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
+    def _client(self, wsdl: str) -> Client:
+        """Return this thread's client for the given WSDL, cloning the shared parsed client once."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(wsdl)
+        if client is None:
+            prototype = _get_prototype_client(wsdl, self.wsdl_cache_dir, self.wsdl_cache_days, self.timeout)
+            client = _clone_client(prototype, self.timeout)
+            if self.metrics is not None:
+                client.set_options(plugins=[_message_timer])
+            clients[wsdl] = client
+        return client
+
     def get_best_match(
         self,
         address: str,
@@ -35,7 +255,8 @@ class GetBestMatchSoap:
         state: str,
         zip: str,
         tax_type: str,
-    ) -> Object:
+        deadline_ms: Optional[int] = None,
+    ) -> Union[Object, GetBestMatchResponse]:
         """
         Calls the GetBestMatch SOAP  API to retrieve the information.
 
@@ -46,13 +267,58 @@ class GetBestMatchSoap:
             state: The state of the address (e.g., "NY"). Optional if zip is provided.
             zip: The ZIP code of the address. Optional if city and state are provided.
             tax_type: The type of tax to look for ("sales" or "use").
-            license_key: Your ServiceObjects license key.
-            is_live: Determines whether to use the live or trial servers.
-            timeout_ms: Timeout, in milliseconds, for the call to the service.
+            deadline_ms: Overall deadline in milliseconds, overriding the instance default. Optional.
 
         Returns:
-            suds.sudsobject.Object: SOAP response containing tax rate details or error.
+            suds.sudsobject.Object: SOAP response containing tax rate details or error
+            (a GetBestMatchResponse in fast mode).
+
+        Raises:
+            ServiceUnavailable: A RuntimeError raised when neither endpoint answered.
+            DeadlineExceeded: A RuntimeError raised when the deadline runs out.
         """
+        args = (address, address2, city, state, zip, tax_type, deadline_ms)
+        if self.metrics is None:
+            return self._get_best_match(*args)
+
+        trace = LookupMetrics("soap")
+        start = time.perf_counter()
+        try:
+            response = self._get_best_match(*args, trace)
+            error = getattr(response, "Error", None)
+            trace.error_number = error.Number if error else None
+            return response
+        except Exception as exc:
+            trace.exception = type(exc).__name__
+            raise
+        finally:
+            trace.total = time.perf_counter() - start
+            self.metrics.record(trace)
+
+    def _get_best_match(
+        self,
+        address: str,
+        address2: str,
+        city: str,
+        state: str,
+        zip: str,
+        tax_type: str,
+        deadline_ms: Optional[int],
+        trace: Optional[LookupMetrics] = None,
+    ) -> Union[Object, GetBestMatchResponse]:
+        if deadline_ms is None:
+            deadline_ms = self.deadline_ms
+        deadline = Deadline(deadline_ms / 1000.0 if deadline_ms is not None else None)
+        # Only the cache and single-flight need the normalized key; plain lookups skip building it
+        key = None
+        if self.cache is not None or self.single_flight is not None:
+            key = ResultCache.make_key(address, address2, city, state, zip, tax_type, self.is_live)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if trace is not None:
+                    trace.source = "cache"
+                return cached
 
         # Common kwargs for both calls
         call_kwargs = dict(
@@ -64,36 +330,124 @@ class GetBestMatchSoap:
             TaxType=tax_type,
             LicenseKey=self.license_key,
         )
+        if self.single_flight is not None:
+            response = self.single_flight.do(
+                key + (self.license_key,), lambda: self._call(call_kwargs, deadline, trace), deadline
+            )
+            if trace is not None and trace.attempts == 0:
+                trace.source = "coalesced"
+        else:
+            response = self._call(call_kwargs, deadline, trace)
+        if self.cache is not None:
+            self.cache.put(key, response)
+        return response
+
+    def _call(self, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> Object:
+        return call_with_retry(partial(self._call_once, call_kwargs, deadline, trace), self.retry, deadline)
 
-        # Attempt primary
+    def _call_once(self, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> Object:
+        if trace is not None:
+            trace.attempts += 1
+        # Primary first (skipped while its circuit is open), then backup
         try:
-            client = Client(self._primary_wsdl)
-            # Override endpoint URL if needed:
-            # client.set_options(location=self._primary_wsdl.replace('?wsdl','/soap'))
+            return call_with_failover(
+                self.primary_health, partial(self._call_primary, call_kwargs, deadline, trace),
+                self.backup_health, partial(self._call_backup, call_kwargs, deadline, trace),
+                self.hedge_delay, self._get_hedge_executor() if self.hedge_delay is not None else None,
+            )
+        except DeadlineExceeded:
+            raise
+        except (WebFault, Exception) as backup_ex:
+            primary_ex = backup_ex.__cause__
+            msg = (
+                "Both primary and backup endpoints failed.\n"
+                f"Primary error: {str(primary_ex) if primary_ex is not None else 'skipped, circuit open'}\n"
+                f"Backup error: {str(backup_ex)}"
+            )
+            raise ServiceUnavailable(msg) from backup_ex
+
+    def _call_primary(self, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> Object:
+        response, timings = self._send(self._primary_wsdl, self._primary_endpoint, call_kwargs, deadline, trace)
+
+        # If response invalid or Error.Number == "4", trigger fallback
+        if response is None or (
+            hasattr(response, "Error")
+            and response.Error
+            and response.Error.Number == "4"
+        ):
+            raise ValueError("Primary returned no result or Error.Number=4")
+
+        if trace is not None:
+            trace.served("primary" if self.is_live else "trial", *timings)
+        return response
+
+    def _call_backup(self, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics] = None) -> Object:
+        response, timings = self._send(self._backup_wsdl, self._backup_endpoint, call_kwargs, deadline, trace)
+        if response is None:
+            raise ValueError("Backup returned no result")
+        if trace is not None:
+            trace.served("backup" if self.is_live else "trial", *timings)
+        return response
+
+    def _send(
+        self, wsdl: str, endpoint: str, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics]
+    ) -> Tuple[Union[Object, GetBestMatchResponse, None], Optional[Tuple[float, float, float, float]]]:
+        """
+        Call GetBestMatch through wsdl (suds) or endpoint (fast mode); returns the response and, when traced,
+        (connect, ttfb, read, parse).
+        """
+        if self.rate_limiter is None and self.concurrency_limiter is None:
+            return self._request(wsdl, endpoint, call_kwargs, deadline, trace)
+        return call_limited(
+            partial(self._request, wsdl, endpoint, call_kwargs, deadline, trace),
+            self.rate_limiter, self.concurrency_limiter, deadline, _needs_failover
+        )
+
+    def _request(
+        self, wsdl: str, endpoint: str, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics]
+    ) -> Tuple[Union[Object, GetBestMatchResponse, None], Optional[Tuple[float, float, float, float]]]:
+        if self.fast:
+            with deadline.timeouts(requests.Timeout):
+                return self._post(endpoint, call_kwargs, deadline, trace)
+        client = self._client(wsdl)
+        # suds has a single socket timeout, so connect and read share the clipped budget
+        client.set_options(timeout=deadline.clip(self.timeout))
+        # Override endpoint URL if needed:
+        # client.set_options(location=wsdl.replace('?wsdl','/soap'))
+        # suds surfaces its socket timeout as socket.timeout, or as URLError while connecting
+        with deadline.timeouts(socket.timeout, URLError):
             response = client.service.GetBestMatch(**call_kwargs)
+        if trace is None:
+            return response, None
+        times = _message_timer.times
+        return response, (0.0, times.received - times.sent, 0.0, time.perf_counter() - times.received)
 
-            # If response invalid or Error.Number == "4", trigger fallback
-            if response is None or (
-                hasattr(response, "Error")
-                and response.Error
-                and response.Error.Number == "4"
-            ):
-                raise ValueError("Primary returned no result or Error.Number=4")
+    def _post(
+        self, url: str, call_kwargs: dict, deadline: Deadline, trace: Optional[LookupMetrics]
+    ) -> Tuple[Optional[GetBestMatchResponse], Optional[Tuple[float, float, float, float]]]:
+        body = _ENVELOPE.format(**{name: escape(value or "") for name, value in call_kwargs.items()}).encode("utf-8")
+        timeout = deadline.clip(self.timeout)
+        if trace is None:
+            # Parse while the reply is still arriving instead of buffering it first
+            with self.session.post(url, data=body, headers=_SOAP_HEADERS, timeout=timeout, stream=True) as response:
+                _raise_for_status(response)
+                response.raw.decode_content = True
+                data = parse_best_match_xml(response.raw)
+            return (decode_best_match(data) if data is not None else None), None
 
-            return response
+        payload, connect, ttfb, read = timed_post(self.session, url, body, _SOAP_HEADERS, timeout, _raise_for_status)
+        start = time.perf_counter()
+        data = parse_best_match_xml(payload)
+        parsed_at = time.perf_counter()
+        if data is None:
+            return None, (connect, ttfb, read, parsed_at - start)
+        response = decode_best_match(data)
+        trace.decode = time.perf_counter() - parsed_at
+        return response, (connect, ttfb, read, parsed_at - start)
 
-        except (WebFault, ValueError, Exception) as primary_ex:
-            # Attempt backup
-            try:
-                client = Client(self._backup_wsdl)
-                response = client.service.GetBestMatch(**call_kwargs)
-                if response is None:
-                    raise ValueError("Backup returned no result")
-                return response
-            except (WebFault, Exception) as backup_ex:
-                msg = (
-                    "Both primary and backup endpoints failed.\n"
-                    f"Primary error: {str(primary_ex)}\n"
-                    f"Backup error: {str(backup_ex)}"
-                )
-                raise RuntimeError(msg)
\ No newline at end of file
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(thread_name_prefix="fast-tax-soap-hedge")
+        return self._hedge_executor
@@ -0,0 +1,280 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "REST"))
+sys.path.insert(0, os.path.join(HERE, "..", "SOAP"))
+
+from mock_server import MockFastTaxServer
+from ft_response import GetBestMatchInput
+from get_best_match_rest import FastTaxClient
+
+LICENSE_KEY = "BENCHMARK"
+
+
+def make_inputs(count: int) -> List[GetBestMatchInput]:
+    """Distinct Address-level inputs spread over 100 ZIP codes."""
+    return [
+        GetBestMatchInput(
+            Address=f"{n + 1} E Cota St", Address2="", City="Santa Barbara", State="CA",
+            Zip=str(93000 + n % 100), TaxType="sales", LicenseKey=LICENSE_KEY, IsLive=True,
+        )
+        for n in range(count)
+    ]
+
+
+def _timed(latencies: List[float], fn: Callable) -> Callable:
+    def call(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return call
+
+
+def _timed_async(latencies: List[float], fn: Callable) -> Callable:
+    async def call(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return call
+
+
+def _rest_client(server: MockFastTaxServer, concurrency: int, response_format: str = "json") -> FastTaxClient:
+    return FastTaxClient(
+        pool_maxsize=max(concurrency, 10),
+        primary_url=server.json_url("primary"),
+        backup_url=server.json_url("backup"),
+        trial_url=server.json_url("trial"),
+        response_format=response_format,
+    )
+
+
+def bench_rest(server, inputs, latencies, concurrency, response_format: str = "json") -> int:
+    errors = 0
+    with _rest_client(server, concurrency, response_format) as client:
+        get_best_match = _timed(latencies, client.get_best_match)
+        for item in inputs:
+            try:
+                get_best_match(item.Address, item.Address2, item.City, item.State, item.Zip,
+                               item.TaxType, item.LicenseKey, item.IsLive)
+            except RuntimeError:
+                errors += 1
+    return errors
+
+
+def bench_rest_xml(server, inputs, latencies, concurrency) -> int:
+    return bench_rest(server, inputs, latencies, concurrency, "xml")
+
+
+def bench_rest_batch(server, inputs, latencies, concurrency) -> int:
+    with _rest_client(server, concurrency) as client:
+        # iter_best_match_batch() goes through get_best_match(), so timing the instance attribute times every lookup
+        client.get_best_match = _timed(latencies, client.get_best_match)
+        return sum(isinstance(result, Exception) for result in client.iter_best_match_batch(inputs, concurrency))
+
+
+def bench_rest_async(server, inputs, latencies, concurrency) -> int:
+    from get_best_match_rest_async import AsyncFastTaxClient
+
+    async def run() -> int:
+        async with AsyncFastTaxClient(
+            max_in_flight=concurrency,
+            pool_maxsize=max(concurrency, 10),
+            primary_url=server.json_url("primary"),
+            backup_url=server.json_url("backup"),
+            trial_url=server.json_url("trial"),
+        ) as client:
+            client.get_best_match = _timed_async(latencies, client.get_best_match)
+            results = await client.get_best_match_batch(inputs)
+        return sum(isinstance(result, Exception) for result in results)
+
+    return asyncio.run(run())
+
+
+def _soap_service(server: MockFastTaxServer, fast: bool = False):
+    from get_best_match_soap import GetBestMatchSoap
+
+    return GetBestMatchSoap(
+        LICENSE_KEY, True, 10000,
+        primary_wsdl=server.wsdl_url("primary"),
+        backup_wsdl=server.wsdl_url("backup"),
+        fast=fast,
+    )
+
+
+def _soap_call(service, get_best_match, item) -> bool:
+    try:
+        get_best_match(item.Address, item.Address2, item.City, item.State, item.Zip, item.TaxType)
+        return True
+    except RuntimeError:
+        return False
+
+
+def bench_soap(server, inputs, latencies, concurrency) -> int:
+    service = _soap_service(server)
+    get_best_match = _timed(latencies, service.get_best_match)
+    return sum(not _soap_call(service, get_best_match, item) for item in inputs)
+
+
+def bench_soap_threads(server, inputs, latencies, concurrency) -> int:
+    service = _soap_service(server)
+    get_best_match = _timed(latencies, service.get_best_match)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return sum(not ok for ok in pool.map(lambda item: _soap_call(service, get_best_match, item), inputs))
+
+
+def bench_soap_fast(server, inputs, latencies, concurrency) -> int:
+    service = _soap_service(server, fast=True)
+    get_best_match = _timed(latencies, service.get_best_match)
+    return sum(not _soap_call(service, get_best_match, item) for item in inputs)
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "rest": bench_rest,
+    "rest-xml": bench_rest_xml,
+    "rest-batch": bench_rest_batch,
+    "rest-async": bench_rest_async,
+    "soap": bench_soap,
+    "soap-threads": bench_soap_threads,
+    "soap-fast": bench_soap_fast,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(
+    name: str,
+    server: MockFastTaxServer,
+    requests: int,
+    concurrency: int,
+    warmup: int = 20,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run one scenario against server and return its measurements: throughput in lookups per second,
+    p50/p99 latency of a single lookup in milliseconds and, with trace_memory, the scenario's own Python
+    heap peak in KB. The heap peak comes from a second, traced pass over the same inputs, so tracemalloc
+    overhead stays out of the timings. It includes the in-process mock server's allocations.
+    """
+    bench = SCENARIOS[name]
+    # Warm-up: connection pools, WSDL parsing and imports stay out of the measured run
+    bench(server, make_inputs(warmup), [], concurrency)
+
+    inputs = make_inputs(requests)
+    latencies: List[float] = []
+    start = time.perf_counter()
+    errors = bench(server, inputs, latencies, concurrency)
+    seconds = time.perf_counter() - start
+    heap_peak = None
+    if trace_memory:
+        # tracemalloc.start() begins with no traces, so the peak covers this pass only
+        tracemalloc.start()
+        try:
+            bench(server, inputs, [], concurrency)
+            heap_peak = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+
+    latencies.sort()
+    p50, p99 = percentile(latencies, 0.50), percentile(latencies, 0.99)
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput": round(requests / seconds, 1),
+        "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+        "p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+        "heap_peak_kb": heap_peak,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return a message for every scenario whose throughput fell, or p99 or heap peak rose, by more than tolerance."""
+    previous = {result["scenario"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{result['scenario']}: throughput {before['throughput']} -> {result['throughput']}/s")
+        if before["p99_ms"] and result["p99_ms"] and result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p99 {before['p99_ms']} -> {result['p99_ms']} ms")
+        before_heap, heap = before.get("heap_peak_kb"), result.get("heap_peak_kb")
+        if before_heap and heap and heap > before_heap * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: heap peak {before_heap} -> {heap} KB")
+    return regressions
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    header = f"{'Scenario':<14}{'Requests':>9}{'Errors':>8}{'Lookups/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'Heap KB':>9}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['scenario']:<14}{result['requests']:>9}{result['errors']:>8}{result['throughput']:>11}"
+              f"{result['p50_ms']!s:>9}{result['p99_ms']!s:>9}{result['heap_peak_kb']!s:>9}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the FastTax clients against a local stand-in server.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios ({', '.join(SCENARIOS)}).")
+    parser.add_argument("--requests", type=int, default=1000, help="Lookups per scenario.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Lookups in flight for batch/async/threaded modes.")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Mock server latency per lookup.")
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of lookups answered with HTTP 500.")
+    parser.add_argument("--failover-rate", type=float, default=0.0,
+                        help="Fraction of primary lookups answered with Error.Number 4.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="Skip the traced pass that measures each scenario's Python heap peak.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --save; exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change against the baseline.")
+    args = parser.parse_args(argv)
+
+    results = []
+    with MockFastTaxServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                           failover_rate=args.failover_rate, seed=args.seed) as server:
+        for name in args.scenarios.split(","):
+            results.append(run_scenario(name.strip(), server, args.requests, args.concurrency,
+                                        args.warmup, args.trace_memory))
+        print(f"Mock server requests: {server.requests}\n")
+    _print_table(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as save_file:
+            json.dump(results, save_file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+
+WSDL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fast_tax.wsdl")
+
+# Paths served for each endpoint; the URL prefix ("/primary", "/backup" or "/trial") names the endpoint
+JSON_PATH = "/ft/web.svc/json/GetBestMatch"
+XML_PATH = "/ft/web.svc/XML/GetBestMatch"
+# As on the real service, the WSDL is served at soap.svc?wsdl and the SOAP endpoint it advertises is soap.svc/SOAP
+SOAP_PATH = "/ft/soap.svc"
+SOAP_ENDPOINT_PATH = SOAP_PATH + "/SOAP"
+
+FAILOVER_ERROR = {"Desc": "Service temporarily unavailable.", "Number": "4", "Location": ""}
+
+
+def _tax_info(zip: str, city: str, rate_offset: float) -> Dict[str, Any]:
+    return {
+        "Zip": zip,
+        "City": city,
+        "County": "Santa Barbara",
+        "StateAbbreviation": "CA",
+        "StateName": "California",
+        "TaxRate": round(0.0875 + rate_offset, 4),
+        "StateRate": 0.06,
+        "CityRate": 0.01,
+        "CountyRate": 0.0025,
+        "CountyDistrictRate": 0.0,
+        "CityDistrictRate": 0.015,
+        "SpecialDistrictRate": round(rate_offset, 4),
+        "InformationComponents": [
+            {"Name": "CountyFIPS", "Value": "06083"},
+            {"Name": "StateFIPS", "Value": "06"},
+        ],
+        "TotalTaxExempt": "False",
+        "NotesCodes": "",
+        "NotesDesc": "",
+    }
+
+
+def best_match_payload(params: Dict[str, str]) -> Dict[str, Any]:
+    """Canned GetBestMatch answer: one Address-level row, or three Zip-level rows for ZIP-only input."""
+    zip = params.get("Zip") or "93101"
+    city = params.get("City") or "Santa Barbara"
+    if params.get("Address"):
+        return {"TaxInfoItems": [_tax_info(zip, city, 0.0)], "MatchLevel": "Address"}
+    return {"TaxInfoItems": [_tax_info(zip, city, 0.0025 * n) for n in range(3)], "MatchLevel": "Zip"}
+
+
+def _xml_fields(values: Dict[str, Any]) -> str:
+    parts = []
+    for name, value in values.items():
+        if isinstance(value, list):
+            parts.append(f"<{name}>" + "".join(
+                f"<InformationComponent>{_xml_fields(item)}</InformationComponent>" for item in value
+            ) + f"</{name}>")
+        elif value is not None:
+            parts.append(f"<{name}>{escape(str(value))}</{name}>")
+    return "".join(parts)
+
+
+def _result_fields(payload: Dict[str, Any]) -> str:
+    items = "".join(f"<BestMatchTaxInfo>{_xml_fields(item)}</BestMatchTaxInfo>" for item in payload.get("TaxInfoItems", ()))
+    error = payload.get("Error")
+    return (
+        (f"<TaxInfoItems>{items}</TaxInfoItems>" if items else "")
+        + (f"<MatchLevel>{payload['MatchLevel']}</MatchLevel>" if payload.get("MatchLevel") else "")
+        + (f"<Error>{_xml_fields(error)}</Error>" if error else "")
+    )
+
+
+def soap_envelope(payload: Dict[str, Any]) -> str:
+    """Render a GetBestMatch payload as the SOAP response the live service returns."""
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+        '<GetBestMatchResponse xmlns="http://www.serviceobjects.com">'
+        '<GetBestMatchResult xmlns:i="http://www.w3.org/2001/XMLSchema-instance">'
+        + _result_fields(payload)
+        + "</GetBestMatchResult></GetBestMatchResponse></s:Body></s:Envelope>"
+    )
+
+
+def xml_document(payload: Dict[str, Any]) -> str:
+    """Render a GetBestMatch payload as the web.svc/XML answer."""
+    return (
+        '<BestMatchResponse xmlns="http://www.serviceobjects.com" '
+        'xmlns:i="http://www.w3.org/2001/XMLSchema-instance">'
+        + _result_fields(payload)
+        + "</BestMatchResponse>"
+    )
+
+
+def _soap_params(body: bytes) -> Dict[str, str]:
+    text = body.decode("utf-8", "replace")
+    return {
+        name: match.group(1)
+        for name in ("Address", "Address2", "City", "State", "Zip", "TaxType", "LicenseKey")
+        for match in [re.search(rf"<(?:\w+:)?{name}>([^<]*)</(?:\w+:)?{name}>", text)]
+        if match
+    }
+
+
+class MockFastTaxServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        failover_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Local stand-in for the FastTax service serving the JSON (web.svc/json/GetBestMatch), XML
+        (web.svc/XML/GetBestMatch) and SOAP (soap.svc/SOAP, WSDL at soap.svc?wsdl) endpoints under /primary,
+        /backup and /trial URL prefixes.
+
+        latency_ms: Added delay before every GetBestMatch answer.
+        jitter_ms: Uniform random extra delay of up to this many milliseconds.
+        error_rate: Fraction of GetBestMatch requests answered with HTTP 500 (SOAP: a fault).
+        failover_rate: Fraction of primary requests answered with Error.Number 4, which makes the
+                       clients fail over to the backup.
+        seed: Seed for the random choices, for repeatable runs.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.failover_rate = failover_rate
+        self.requests: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        with open(WSDL_PATH, encoding="utf-8") as wsdl_file:
+            self._wsdl = wsdl_file.read()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def json_url(self, endpoint: str = "primary") -> str:
+        """GetBestMatch JSON URL of an endpoint ("primary", "backup" or "trial"), for FastTaxClient."""
+        return f"{self.base_url}/{endpoint}{JSON_PATH}?"
+
+    def wsdl_url(self, endpoint: str = "primary") -> str:
+        """WSDL URL of an endpoint, for GetBestMatchSoap."""
+        return f"{self.base_url}/{endpoint}{SOAP_PATH}?wsdl"
+
+    def start(self) -> "MockFastTaxServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-fast-tax", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockFastTaxServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def _outcome(self, endpoint: str) -> Optional[str]:
+        """Pick "error", "failover" or None (a normal answer) and sleep for the configured latency."""
+        with self._lock:
+            roll = self._random.random()
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+        if roll < self.error_rate:
+            return "error"
+        if endpoint == "primary" and roll < self.error_rate + self.failover_rate:
+            return "failover"
+        return None
+
+
+def _handler(server: MockFastTaxServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY, delayed ACKs add ~40ms per answer
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send(self, status: int, content_type: str, body: str) -> None:
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self):
+            url = urlparse(self.path)
+            endpoint, _, path = url.path.lstrip("/").partition("/")
+            return endpoint, "/" + path, url.query
+
+        def do_GET(self) -> None:
+            endpoint, path, query = self._route()
+            if path == SOAP_PATH and query.lower() == "wsdl":
+                server._count("wsdl")
+                location = f"{server.base_url}/{endpoint}{SOAP_ENDPOINT_PATH}"
+                self._send(200, "text/xml; charset=utf-8", server._wsdl.replace("{location}", location))
+                return
+            if path.lower() == JSON_PATH.lower():
+                wire_format = "json"
+            elif path.lower() == XML_PATH.lower():
+                wire_format = "xml"
+            else:
+                self._send(404, "text/plain", "not found")
+                return
+            server._count(f"{endpoint}.{wire_format}")
+            outcome = server._outcome(endpoint)
+            if outcome == "error":
+                self._send(500, "text/plain", "mock server error")
+                return
+            params = {name: values[0] for name, values in parse_qs(query).items()}
+            payload = {"Error": FAILOVER_ERROR} if outcome == "failover" else best_match_payload(params)
+            if wire_format == "xml":
+                self._send(200, "application/xml; charset=utf-8", xml_document(payload))
+            else:
+                self._send(200, "application/json; charset=utf-8", json.dumps(payload))
+
+        def do_POST(self) -> None:
+            endpoint, path, _ = self._route()
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if path.lower() != SOAP_ENDPOINT_PATH.lower():
+                self._send(404, "text/plain", "not found")
+                return
+            server._count(f"{endpoint}.soap")
+            outcome = server._outcome(endpoint)
+            if outcome == "error":
+                fault = (
+                    '<?xml version="1.0" encoding="utf-8"?>'
+                    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body><s:Fault>'
+                    "<faultcode>s:Server</faultcode><faultstring>mock server error</faultstring>"
+                    "</s:Fault></s:Body></s:Envelope>"
+                )
+                self._send(500, "text/xml; charset=utf-8", fault)
+                return
+            payload = {"Error": FAILOVER_ERROR} if outcome == "failover" else best_match_payload(_soap_params(body))
+            self._send(200, "text/xml; charset=utf-8", soap_envelope(payload))
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local FastTax stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--failover-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = MockFastTaxServer(args.host, args.port, args.latency_ms, args.jitter_ms,
+                               args.error_rate, args.failover_rate, args.seed)
+    print(f"JSON: {server.json_url('primary')}  {server.json_url('backup')}")
+    print(f"SOAP: {server.wsdl_url('primary')}  {server.wsdl_url('backup')}")
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()